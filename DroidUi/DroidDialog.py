@@ -20,7 +20,7 @@
 
 import datetime
 import warnings
-from .sl4a import sl4a
+from .sl4a import _a
 from .DroidConstants import TEXT, TEXT_PASSWORD, NUMBER_SIGNED, NUMBER_DECIMAL
 from .DroidConstants import stringlize, isstring
 
@@ -47,13 +47,17 @@ class _Dialog(object):
 
 	def __init__(self):
 		if not hasattr(_Dialog, '_a'):
-			setattr(_Dialog, '_a', sl4a())
+			setattr(_Dialog, '_a', _a)
 		self.result = None
 
 	def call(self, func, *args):
 		'''wrapper for sl4a.sl4a'''
 		return getattr(self._a, func)(*args)
 
+	def batch(self):
+		'''send calls in the with block in one round trip, see sl4a.batch()'''
+		return self._a.batch()
+
 	def create(self, type, *args):
 		'''create dialog, for TYPE, see DialogType'''
 		self.call(self.DialogType[type], *args)
@@ -105,14 +109,15 @@ class _Dialog(object):
 		'''BACK key click callback function'''
 		self.cancel(data)
 
-	def handle(self):
-		'''handle dialog event'''
+	def handle(self, data = None):
+		'''handle dialog event
+		DATA is the dialog response, get it from server if None'''
 		_Handler = {
 			'positive': self.yes,
 			'neutral': self.cancel,
 			'negative': self.no,
 		}
-		data = self.response()
+		if data is None: data = self.response()
 		if 'which' in data:
 			_Handler[data['which']](data)
 		elif 'canceled' in data:
@@ -121,8 +126,11 @@ class _Dialog(object):
 			warnings.warn('Unknown response: %s' % data)
 
 	def main(self):
-		self.handle()
-		self.dismiss()
+		# dismiss is queued right after the response, one round trip for both
+		with self.batch():
+			data = self.response()
+			self.dismiss()
+		self.handle(data.result)
 
 def _merge(d, **kw):
 	# set default value for dict
@@ -134,10 +142,11 @@ def _merge(d, **kw):
 
 def _askstring(title, message, default, type, **kw):
 	d = _Dialog()
-	d.create('input', title, message, stringlize(default), type)
 	_merge(kw, yes = OK, no = CANCEL)
-	d.buttons(**kw)
-	d.show()
+	with d.batch():
+		d.create('input', title, message, stringlize(default), type)
+		d.buttons(**kw)
+		d.show()
 	d.main()
 	return d.result['value'] if d.result else None
 
@@ -188,10 +197,11 @@ def askvalue(title, message, value = 50, max = 100, **kw):
 	MAX - max value (100 by default)
 	KW - same as KW in askstring()'''
 	d = _Dialog()
-	d.create('seekbar', value, max, title, message)
 	_merge(kw, yes = OK, no = CANCEL)
-	d.buttons(**kw)
-	d.show()
+	with d.batch():
+		d.create('seekbar', value, max, title, message)
+		d.buttons(**kw)
+		d.show()
 	d.main()
 	return d.result['progress'] if d.result else None
 
@@ -202,8 +212,9 @@ def askdate(date = None):
 	'''get a date, if DATE is None, using today as default'''
 	if date is None: date = datetime.date.today()
 	d = _Dialog()
-	d.create('date', date.year, date.month, date.day)
-	d.show()
+	with d.batch():
+		d.create('date', date.year, date.month, date.day)
+		d.show()
 	d.main()
 	r = d.result
 	if r: r = datetime.date(r['year'], r['month'], r['day'])
@@ -217,8 +228,9 @@ def asktime(time = None):
 	NOTE: only hour and minute is supported'''
 	if time is None: time = datetime.datetime.now().time()
 	d = _Dialog()
-	d.create('time', time.hour, time.minute, True)
-	d.show()
+	with d.batch():
+		d.create('time', time.hour, time.minute, True)
+		d.show()
 	d.main()
 	r = d.result
 	if r: r = datetime.time(r['hour'], r['minute'])
@@ -229,11 +241,12 @@ def asktime(time = None):
 
 def _choose(title, items, multi, **kw):
 	d = _Dialog()
-	d.create('alert', title)
-	d.list(items, multi)
 	_merge(kw, yes = OK, no = CANCEL)
-	d.buttons(**kw)
-	d.show()
+	with d.batch():
+		d.create('alert', title)
+		d.list(items, multi)
+		d.buttons(**kw)
+		d.show()
 	d.handle()
 	if d.result is None: return None
 	r = d.selected()
@@ -254,9 +267,10 @@ def pick(title, items):
 	'''choose one items from ITEMS
 	RETURN:  the selected item, or None if cancelled'''
 	d = _Dialog()
-	d.create('alert', title)
-	d.call('dialogSetItems', items)
-	d.show()
+	with d.batch():
+		d.create('alert', title)
+		d.call('dialogSetItems', items)
+		d.show()
 	r = d.response()
 	return 'item' in r and items[r['item']] or None
 
@@ -267,9 +281,10 @@ class _Alert(_Dialog):
 
 	def __init__(self, title, message, yes, no, cancel = None):
 		_Dialog.__init__(self)
-		self.create('alert', title, message)
-		self.buttons(yes, no, cancel)
-		self.show()
+		with self.batch():
+			self.create('alert', title, message)
+			self.buttons(yes, no, cancel)
+			self.show()
 
 	def yes(self, data):
 		self.result = True
@@ -340,9 +355,10 @@ class _Dialog2(_Dialog):
 		self._yes = _btnMeta(kw['yes'], YES, True)
 		self._no = _btnMeta(kw['no'], NO, False)
 		self._cancel = _btnMeta(kw['cancel'], CANCEL, None)
-		self.create('alert', title, message)
-		self.buttons(self._yes.text, self._no.text, self._cancel.text)
-		self.show()
+		with self.batch():
+			self.create('alert', title, message)
+			self.buttons(self._yes.text, self._no.text, self._cancel.text)
+			self.show()
 
 	def handler(self, meta, data):
 		self.result = meta.ret
@@ -22,9 +22,13 @@
 # Update: 2013-05-19 04:11
 
 
+import copy
+import time
 import warnings
+import threading
+from collections import OrderedDict
 from base64 import b64encode, b64decode
-from .sl4a import sl4a, sl4aError, _a
+from .sl4a import sl4a, sl4aProxy, sl4aError, _a
 from .DroidConstants import SENSOR_ALL, BLUETOOTH_UUID, INBOX, CATEGORY_DEFAULT
 
 
@@ -32,12 +36,73 @@ class _Facade(object):
 	pass
 
 
+def _copy(value):
+	'''VALUE to hand out of a cache, lists and dicts are copied so callers can't change the cached one'''
+	return copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+
+
+class _Cache(object):
+	'''TTL/LRU result cache of one facade method'''
+	# all caches, for clearCache()
+	caches = []
+
+	def __init__(self, ttl, size):
+		self.ttl = ttl
+		self.size = size
+		self._lock = threading.Lock()
+		self._data = OrderedDict()
+		_Cache.caches.append(self)
+
+	def get(self, key, func, args):
+		now = time.time()
+		with self._lock:
+			if key in self._data:
+				value, expire = self._data.pop(key)
+				if expire is None or expire > now:
+					# most recently used goes last
+					self._data[key] = value, expire
+					return _copy(value)
+		value = func(*args)
+		with self._lock:
+			self._data[key] = value, (None if self.ttl is None else now + self.ttl)
+			while len(self._data) > self.size:
+				self._data.popitem(last = False)
+		return _copy(value)
+
+	def clear(self):
+		with self._lock:
+			self._data.clear()
+
+
+def cached(ttl = None, size = 16):
+	'''cache results of a facade method, keyed by its arguments
+	TTL  - seconds a result stays valid, None to keep it forever
+	SIZE - max number of results kept, least recently used ones are dropped
+	lists and dicts are returned as copies, changing them doesn't change the cache
+	the decorated method gets an invalidate() to drop its cached results,
+	e.g. Sim.serial.invalidate()'''
+	def decorator(func):
+		cache = _Cache(ttl, size)
+		def wrapper(*args):
+			return cache.get(args, func, args)
+		wrapper.__name__ = func.__name__
+		wrapper.__doc__ = func.__doc__
+		wrapper.invalidate = cache.clear
+		return wrapper
+	return decorator
+
+def clearCache():
+	'''drop all cached facade results'''
+	for cache in _Cache.caches:
+		cache.clear()
+
+
 class Event(_Facade):
 	'''Wrapper functions for EventFacade
 	(http://www.mithril.com.au/android/doc/EventFacade.html)'''
 
 	def __init__(self, droid, **handler):
-		assert isinstance(droid, sl4a)
+		assert isinstance(droid, (sl4a, sl4aProxy))
 		self.droid = droid
 		self._handler = {}
 		self._loop = True
@@ -46,12 +111,12 @@ class Event(_Facade):
 
 	def clear(self):
 		'''Clears all events from the event buffer'''
-		self.droid.eventClearBuffer()
+		self.droid.events.clear()
 
 	def poll(self, count = 1):
 		'''Returns and removes the oldest COUNT events
 		(i.e. location or sensor update, etc.) from the event buffer'''
-		return self.droid.eventPoll(count)
+		return self.droid.events.poll(count)
 
 	def post(self, name, data, enqueue = False):
 		'''Post an event to the event queue
@@ -64,14 +129,14 @@ class Event(_Facade):
 		'''Blocks until an event occurs. The returned event is removed from the buffer
 		timeout (Integer) the maximum time to wait (in ms)
 		returns: (Event) Map of event properties'''
-		return self.droid.eventWait(timeout)
+		return self.droid.events.wait(timeout)
 
 	def waitFor(self, name, timeout = None):
 		'''Blocks until an event with the supplied name occurs. The returned event is not removed from the buffer
 		name (String)
 		timeout (Integer) the maximum time to wait (in ms)
 		returns: (Event) Map of event properties'''
-		return self.droid.eventWait(name, timeout)
+		return self.droid.events.waitFor(name, timeout)
 
 	def register(self, name, handler):
 		'''register event handler
@@ -251,6 +316,7 @@ class Location(_Facade):
 		return _a.readLocation()
 
 	@classmethod
+	@cached(ttl = 60)
 	def providers(cls):
 		'''Returns availables providers on the phone'''
 		return _a.locationProviders()
@@ -387,6 +453,7 @@ class Phone(_Facade):
 		return _a.getCellLocation()
 
 	@classmethod
+	@cached()
 	def id(cls):
 		'''Returns the unique device ID
 		for example, the IMEI for GSM and the MEID for CDMA phones.
@@ -394,6 +461,7 @@ class Phone(_Facade):
 		return _a.getDeviceId()
 
 	@classmethod
+	@cached()
 	def version(cls):
 		'''Returns the software version number for the device
 		for example, the IMEI/SV for GSM phones
@@ -401,6 +469,7 @@ class Phone(_Facade):
 		return _a.getDeviceSoftwareVersion()
 
 	@classmethod
+	@cached(ttl = 60)
 	def number(cls):
 		'''Returns the phone number string for line 1
 		for example, the MSISDN for a GSM phone
@@ -428,11 +497,13 @@ class Phone(_Facade):
 		return _a.getNetworkType()
 
 	@classmethod
+	@cached()
 	def type(cls):
 		'''Returns the device phone type'''
 		return _a.getPhoneType()
 
 	@classmethod
+	@cached(ttl = 60)
 	def subscriber(cls):
 		'''Returns the unique subscriber ID
 		for example, the IMSI for a GSM phone
@@ -475,6 +546,7 @@ class Phone(_Facade):
 			_a.setRingerVolume(volume)
 
 	@classmethod
+	@cached()
 	def maxVolume(cls):
 		'''Returns the maximum ringer volume'''
 		return _a.getMaxRingerVolume()
@@ -549,22 +621,26 @@ class Sim(_Facade):
 		return _a.getSimState()
 
 	@classmethod
+	@cached(ttl = 60)
 	def serial(cls):
 		'''Returns the serial number of the SIM, if applicable
 		Return null if it is unavailable'''
 		return _a.getSimSerialNumber()
 
 	@classmethod
+	@cached(ttl = 60)
 	def country(cls):
 		'''Returns the ISO country code equivalent for the SIM provider's country code'''
 		return _a.getSimCountryIso()
 
 	@classmethod
+	@cached(ttl = 60)
 	def operator(cls):
 		'''Returns the MCC+MNC (mobile country code + mobile network code) of the provider of the SIM. 5 or 6 decimal digits'''
 		return _a.getSimOperator()
 
 	@classmethod
+	@cached(ttl = 60)
 	def operatorName(cls):
 		'''Returns the Service Provider Name (SPN)'''
 		return _a.getSimOperatorName()
@@ -575,6 +651,7 @@ class Contact(_Facade):
 	(http://www.mithril.com.au/android/doc/ContactsFacade.html)'''
 
 	@classmethod
+	@cached()
 	def attrs(cls):
 		'''Returns a List of all possible attributes for contacts'''
 		return _a.contactsGetAttributes()
@@ -613,6 +690,7 @@ class Sms(_Facade):
 	(http://www.mithril.com.au/android/doc/SmsFacade.html)'''
 
 	@classmethod
+	@cached()
 	def attrs(cls):
 		'''Returns a List of all possible message attributes'''
 		return _a.smsGetAttributes()
@@ -640,7 +718,7 @@ class Sms(_Facade):
 	@classmethod
 	def mark(cls, read = True, *id):
 		'''Marks messages as read'''
-		return _a.smsDeleteMessage(id, read)
+		return _a.smsMarkMessageRead(id, read)
 
 	@classmethod
 	def send(cls, address, text):
@@ -692,10 +770,22 @@ class Package(_Facade):
 	def __str__(self):
 		return 'package: %s, version: %s, code: %s' % (self.pkg, self.version(), self.code())
 
+	# same package shares cached results
+	def __eq__(self, other):
+		return isinstance(other, Package) and self.pkg == other.pkg
+
+	def __ne__(self, other):
+		return not self == other
+
+	def __hash__(self):
+		return hash(self.pkg)
+
+	@cached(ttl = 60)
 	def version(self):
 		'''Returns package version name'''
 		return _a.getPackageVersion(self.pkg)
 
+	@cached(ttl = 60)
 	def code(self):
 		'''Returns package version code'''
 		return _a.getPackageVersionCode(self.pkg)
@@ -716,15 +806,27 @@ class Class(_Facade):
 	def __init__(self, name):
 		self.name = name
 
+	# same class shares cached results
+	def __eq__(self, other):
+		return isinstance(other, Class) and self.name == other.name
+
+	def __ne__(self, other):
+		return not self == other
+
+	def __hash__(self):
+		return hash(self.name)
+
 	def launch(self):
 		'''Start activity with the given class name'''
 		_a.launch(self.name)
 
+	@cached()
 	def consts(self):
 		'''Get list of constants (static final fields) for a class'''
 		return _a.getConstants(self.name)
 
 	@classmethod
+	@cached(ttl = 60)
 	def launchable(cls):
 		'''Returns a dict of all launchable application class names'''
 		return _a.getLaunchableApplications()
@@ -877,6 +979,7 @@ class Bluetooth(_Facade):
 		return _a.bluetoothGetConnectedDeviceName(self.conn)
 
 	@classmethod
+	@cached()
 	def address(cls):
 		'''Returns the hardware address of the local Bluetooth adapter'''
 		return _a.bluetoothGetLocalAddress()
@@ -1032,6 +1135,7 @@ class Player(_Facade):
 			_a.setMediaVolume(volume)
 
 	@classmethod
+	@cached()
 	def maxVolume(cls):
 		'''Returns the maximum media volume'''
 		return _a.getMaxMediaVolume()
@@ -1069,7 +1173,7 @@ class Recorder(_Facade):
 		Otherwise it will block for the time period equal to the duration argument
 		path (String)
 		audio (Boolean) (default=true)'''
-		return _a.recorderCaptureVideo(path, audio)
+		return _a.recorderCaptureVideo(path, None, audio)
 
 	@classmethod
 	def stop(cls):
@@ -1118,6 +1222,7 @@ class Misc(_Facade):
 	(SpeechRecognitionFacade, TextToSpeechFacade, ToneGeneratorFacade, AndroidFacade)'''
 
 	@classmethod
+	@cached(ttl = 60)
 	def env(cls):
 		'''A map of various useful environment details'''
 		return _a.environment()
@@ -1167,8 +1272,6 @@ class Misc(_Facade):
 
 
 if __name__ == '__main__':
-	import time
-
 	def bluetooth(server = False):
 		import DroidDialog as D
 		b = Bluetooth()
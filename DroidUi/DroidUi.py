@@ -28,11 +28,21 @@ under android.
 '''
 
 
+import sys
+import copy
+import types
 import warnings
+import threading
 import xml.etree.ElementTree as ET
-from .sl4a import _a
+from io import BytesIO
+from contextlib import contextmanager
+try:
+	from collections.abc import Mapping
+except ImportError:	# python 2
+	from collections import Mapping
+from .sl4a import _a, sl4aError
 from .DroidConstants import BACK, MENU, WRAP_CONTENT, FILL_PARENT, MATCH_PARENT, VERTICAL
-from .DroidConstants import stringlize, XML_ENCODING
+from .DroidConstants import stringlize, isstring, XML_ENCODING
 
 
 def NoneHandler(data = None):
@@ -43,18 +53,40 @@ def NoneHandler(data = None):
 class DroidUi(object):
 	'''layout object, like layout resource in android project'''
 	NAMESPACE = 'http://schemas.android.com/apk/res/android'
+	# the layout showed by last fullShow
+	_onscreen = None
 
 	def __init__(self, source = None):
 		'''init layout object with a xml file
 		SOURCE may be a filename or file object'''
 		self._root = None
 		self._oldroot = None
+		# number of ids generated for views without one
+		self._idcount = 0
 		self._loop = True
 		self.showed = False
 		self.objmap = {}
+		# xml needs to be regenerated
 		self._isLayoutDirty = True
+		# views added or moved since last fullShow
+		self._isStructDirty = True
+		# {view: {key: value}} properties not pushed to the screen yet
+		self._changed = {}
+		# depth of frame() blocks
+		self._frame = 0
+		# {view id: fullQueryDetail result} read in current frame
+		self._details = {}
+		# number of fullShow, views drop their shadow values on change
+		self._shows = 0
 		self._xmlLayout = ''
+		# {prefix: uri} namespaces other than android used by the layout
+		self._xmlns = {}
+		# xml of last fullShow, showed again with properties set since on top
+		self._xmlShown = None
+		# {view: {key: value}} properties set since last fullShow
+		self._sinceShow = {}
 		self.title = None
+		self._showedTitle = None
 		self._click_cb = {}
 		self._key_cb = {BACK: self.quit, MENU: NoneHandler}
 		self._optionMenu = []
@@ -67,41 +99,57 @@ class DroidUi(object):
 		if not hasattr(DroidUi, '_a'):
 			setattr(DroidUi, '_a', _a)
 		if source:
-			DroidUi._parse(ET.parse(source).getroot(), self)
+			DroidUi._load(ET.iterparse(source, _EVENTS), self)
 
 	@staticmethod
-	def _parse(element, master):
-		'''build view object from xml Elememt'''
-		attrib = {}
-		id = None
-		for k, v in element.items():
-			# remove namespace mark
-			if k.find(DroidUi.NAMESPACE) != -1:
-				k = k[len(DroidUi.NAMESPACE) + 2:]
-			# id
-			if k == 'id':
-				id = v = v[v.find('/') + 1:]
-			# set attrib
-			attrib[k] = v
-		view = eval('%s(master, attrib)' % element.tag)
-		if id:
-			setattr(view.droid, id, view)
-
-		# iter children
-		for elem in element.getchildren():
-			DroidUi._parse(elem, view)
+	def _load(events, master):
+		'''build view objects from (event, element) of iterparse
+		elements are dropped once loaded, so big layouts are not kept in memory twice'''
+		stack = [master]
+		for event, element in events:
+			if event == 'start-ns':
+				prefix, uri = element
+				if uri != DroidUi.NAMESPACE:
+					master._xmlns[_prefix(uri, prefix)] = uri
+				continue
+			if event == 'end':
+				if element.tag != 'requestFocus': stack.pop()
+				element.clear()
+				continue
+			if element.tag == 'requestFocus':
+				stack[-1].focus()
+				continue
+			attrib = {}
+			id = None
+			for k, v in element.items():
+				k = _key(k)
+				if k == 'id':
+					id = v = v[v.find('/') + 1:]
+				attrib[k] = v
+			view = _viewclass(element.tag)(stack[-1], attrib)
+			if id:
+				setattr(view.droid, id, view)
+			stack.append(view)
 		return master
 
 	@staticmethod
 	def fromxml(xml):
 		'''build layout object from a string contains xml data'''
-		return DroidUi._parse(ET.fromstring(xml), DroidUi())
+		if hasattr(ET, 'XMLPullParser'):
+			parser = ET.XMLPullParser(_EVENTS)
+			parser.feed(xml)
+			parser.close()
+			events = parser.read_events()
+		else:
+			if not isinstance(xml, bytes): xml = xml.encode('utf-8')
+			events = ET.iterparse(BytesIO(xml), _EVENTS)
+		return DroidUi._load(events, DroidUi())
 
 	@staticmethod
 	def fromfile(source):
 		'''build layout object from a xml file
 		SOURCE may be a filename or file object'''
-		return DroidUi._parse(ET.parse(source).getroot(), DroidUi())
+		return DroidUi._load(ET.iterparse(source, _EVENTS), DroidUi())
 
 	def _screen(self, data):
 		'''screen event handler'''
@@ -128,7 +176,11 @@ class DroidUi(object):
 		'''itemclick event handler'''
 		_id = data['id']
 		obj = self.objmap[_id]
-		item = obj._list[int(data['position'])]
+		position = int(data['position'])
+		if isinstance(obj._list, ListAdapter) and obj._list.ismore(position):
+			obj._list.more()
+			return True
+		item = obj._list[position]
 		ret = obj.itemclick(item)
 		# if not handled, try click callback handler
 		if not ret and _id in self._click_cb:
@@ -140,6 +192,12 @@ class DroidUi(object):
 		'''sl4a call wrapper'''
 		return getattr(self._a, fun)(*arg)
 
+	def _genid(self, widgetName):
+		'''a new id for a view without one
+		numbered in the layout, so a script gets the same ids in every run and recorded events replay'''
+		self._idcount += 1
+		return '%s#%d' % (widgetName, self._idcount)
+
 	def reg_obj(self, id, obj):
 		'''register widget objects'''
 		if id in self.objmap: warnings.warn('two widget has same id(%s): %s, %s', id, str(obj), str(self.objmap[id]))
@@ -215,21 +273,94 @@ class DroidUi(object):
 
 	def _eventLoop(self, n):
 		'''event handling loop'''
-		if n == 0: self._a.eventClearBuffer()
+		events = self._a.events
+		if n == 0: events.clear()
 		while self._loop:
-			event = self._a.eventWait()
+			navigator.idle(True)
+			event = events.wait()
+			navigator.idle(False)
 			name = event["name"]
-			if name in self._handler:
-				if not self._handler[name](event['data']):
-					warnings.warn('unhandled event: %s' % str(event))
-			else:
-				warnings.warn('unknown event: %s' % str(event))
+			with self.frame():
+				if name in self._handler:
+					if not self._handler[name](event['data']):
+						warnings.warn('unhandled event: %s' % str(event))
+				else:
+					warnings.warn('unknown event: %s' % str(event))
 		# allow reentry
 		self._loop = True
 
 	def _setdirty(self):
-		'''set the layout is dirty, so when show(), layout needs to be regenerated'''
+		'''set the layout structure is dirty, so when show(), layout needs to be showed again'''
 		self._isLayoutDirty = True
+		self._isStructDirty = True
+
+	def _setchanged(self, view, key, value):
+		'''property KEY of VIEW is changed, it is pushed by next show() or _pushChanges()'''
+		self._isLayoutDirty = True
+		self._changed.setdefault(view, {})[key] = value
+
+	def _setunchanged(self, view, key):
+		'''property KEY of VIEW is set back to its value on screen, drop the pending push'''
+		kw = self._changed.get(view)
+		if kw: kw.pop(key, None)
+
+	@contextmanager
+	def frame(self):
+		'''collect property changes in the with block, push them once on exit
+		a property set many times is pushed once, with its last value.
+		every event handler runs in a frame, use it for updates made outside of mainloop()
+
+		with droid.frame():
+			for view in views:
+				view.configure(background = color)
+
+		properties read by cget() in a frame are cached until it ends'''
+		if not self._frame: self._details = {}
+		self._frame += 1
+		try:
+			yield self
+		finally:
+			self._frame -= 1
+			if not self._frame:
+				self._details = {}
+				if self.showed: self._pushChanges()
+
+	def snapshot(self):
+		'''state of all views on screen with one fullQuery call, see Snapshot
+		in a frame, it serves following cget() calls as well'''
+		state = {}
+		if self.showed:
+			state = self.call('fullQuery') or {}
+			if self._frame: self._details.update(state)
+		return Snapshot(self, state)
+
+	def _detail(self, view):
+		'''fullQueryDetail of VIEW, queried once in a frame'''
+		detail = self._details.get(view.id)
+		if detail is None:
+			detail = self.call('fullQueryDetail', view.id) or {}
+			if self._frame: self._details[view.id] = detail
+		return detail
+
+	def _pushChanges(self):
+		'''push changed properties to the screen with fullSetProperty, in one batch
+		nothing is pushed if another layout is on screen, next fullShow shows them'''
+		if not self._changed or DroidUi._onscreen is not self: return
+		changed, self._changed = self._changed, {}
+		for view in changed:
+			self._details.pop(view.id, None)
+		pushed = []
+		try:
+			with self._a.batch():
+				for view, kw in changed.items():
+					for k, v in kw.items():
+						pushed.append((view, k, v, view._property(k, v)))
+		# views created after showed are unknown to SL4A, they are showed by next fullShow
+		except sl4aError: pass
+		# a failed or timed out push leaves the old value, so setting it again is pushed again
+		for view, k, v, future in pushed:
+			if future.done and not future.error:
+				view._shadowed()[k] = v
 
 	def updateLayout(self):
 		'''update the xml content stands for this layout'''
@@ -237,70 +368,202 @@ class DroidUi(object):
 		if not self._isLayoutDirty: return
 
 		if self._root is None: self._root = TextView(self, text = "You havn't set any View for this layout :(", padding = '30dp')
-		self._root.set('xmlns:android', DroidUi.NAMESPACE)
-		self._xmlLayout = ET.tostring(self._root, XML_ENCODING)
+		if self._root.get('xmlns:android') is None:
+			self._root.set('xmlns:android', DroidUi.NAMESPACE)
+		for prefix, uri in self._xmlns.items():
+			if self._root.get('xmlns:' + prefix) is None:
+				self._root.set('xmlns:' + prefix, uri)
+		self._xmlLayout = self._root._tostring()
 		self._isLayoutDirty = False
 
+	def _showLists(self, changed):
+		'''send windows of list adapters again, fullShow drops the lists.
+		if CHANGED, only those changed while the layout wasn't on screen'''
+		adapters = [view._list for view in self.objmap.values()
+			if isinstance(view._list, ListAdapter) and view._list.view is view and (view._list._dirty or not changed)]
+		if adapters:
+			with self._a.batch():
+				for adapter in adapters:
+					adapter._send()
+
 	def showHook(self):
 		'''called right after layout showed'''
 		pass
 
-	def show(self):
-		'''show the layout on screen'''
-		self.updateLayout()
-
+	def _volatileViews(self):
+		'''views with properties the user may change on screen'''
+		return [view for view in self.objmap.values() if view.volatileConfig]
+
+	def _leave(self, views, state):
+		'''another layout is showed, keep values the user entered, e.g. text of EditText,
+		they are showed again with the layout. STATE is fullQuery read before'''
+		for view in views:
+			values = state.get(view.id)
+			if not values: continue
+			kw = self._sinceShow.setdefault(view, {})
+			for k in view.volatileConfig:
+				v = values.get(k)
+				if v is not None and (k in kw or v != view.get(k)):
+					kw[k] = v
+
+	def _fullShow(self, xml):
 		if self.title is not None:
-			self._a.fullShow(self._xmlLayout, self.title)
+			return self._a.fullShow(xml, self.title)
+		return self._a.fullShow(xml)
+
+	def _restore(self):
+		'''show the xml showed last time again, and properties set since, in one batch'''
+		with self._a.batch():
+			shown = self._fullShow(self._xmlShown)
+			for view, kw in self._sinceShow.items():
+				for k, v in kw.items():
+					view._property(k, v)
+		return shown
+
+	def show(self):
+		'''show the layout on screen
+		if it is on screen already and no view is added since, only changed properties are pushed.
+		if it's showed before, e.g. when a nested mainloop returns, the xml showed
+		last time is showed again with the properties set since'''
+		previous = DroidUi._onscreen
+		inplace = previous is self and not self._isStructDirty and self.title == self._showedTitle
+		if inplace:
+			self._pushChanges()
 		else:
-			self._a.fullShow(self._xmlLayout)
+			leaving = []
+			if previous is not None and previous is not self and previous.showed:
+				leaving = previous._volatileViews()
+			restore = self._xmlShown is not None and not self._isStructDirty and self.title == self._showedTitle
+			if not restore: self.updateLayout()
+			state = shown = None
+			try:
+				# the layout left is read in the same round trip as the new one is showed
+				with self._a.batch():
+					if leaving: state = self._a.fullQuery()
+					shown = self._restore() if restore else self._fullShow(self._xmlLayout)
+			except sl4aError:
+				if state is None or not state.error or shown is None or shown.error: raise
+			if state is not None and not state.error:
+				previous._leave(leaving, state.result or {})
+			if not restore:
+				self._xmlShown = self._xmlLayout
+				self._sinceShow = {}
+			DroidUi._onscreen = self
+			self._shows += 1
+			self._details = {}
+			self._isStructDirty = False
+			self._changed = {}
+			self._showedTitle = self.title
 		self.showed = True
+		self._showLists(inplace)
 		self.showHook()
 
-		self._a.clearOptionsMenu()
-		for m in self._optionMenu:
-			self._a.addOptionsMenuItem(*m)
+		with self._a.batch():
+			self._a.clearOptionsMenu()
+			for m in self._optionMenu:
+				self._a.addOptionsMenuItem(*m)
 
 	def mainloop(self, title = None):
-		'''main loop'''
-		# support serial call to mainloop
-		if not hasattr(DroidUi, 'n'):
-			setattr(DroidUi, 'n', 0)
-			setattr(DroidUi, 'queue', [self])
-		else:
-			DroidUi.n += 1
-			DroidUi.queue.append(self)
-
-		if title is not None: self.title = title
-		self.show()
-
-		try: self._eventLoop(DroidUi.n)
+		'''main loop
+		nested calls show the layout over the current one, see Navigator'''
+		depth = navigator.push(self)
+		try:
+			if title is not None: self.title = title
+			self.show()
+			self._eventLoop(depth)
 		finally:
 			self.showed = False
+			previous = navigator.pop()
 			# if this is the last screen, just quit
-			if 0 == DroidUi.n:
+			if previous is None:
 				self._a.fullDismiss()
+				DroidUi._onscreen = None
 			# or, show previous screen
 			else:
-				DroidUi.queue[DroidUi.n - 1].show()
-			DroidUi.n -= 1
+				previous.show()
+
 
+_intern = getattr(sys, 'intern', None) or intern
 
-class _View(ET._Element):
-	'''View element'''
+# shared property dicts, views with same properties share one
+# {frozenset of (property, value): {property: value}}
+_attrsets = {}
+_ATTRSETS = 4096
+
+def _attrset(cnf):
+	'''shared read only property dict of CNF'''
+	items = frozenset([(k, stringlize(v)) for k, v in cnf.items()])
+	try:
+		return _attrsets[items]
+	except KeyError:
+		pass
+	if len(_attrsets) >= _ATTRSETS: _attrsets.clear()
+	attrs = _attrsets[items] = dict([(_intern(k), v) for k, v in items])
+	return attrs
+
+# property name -> attribute name in xml
+_names = {}
+
+def _attrname(key):
+	try:
+		return _names[key]
+	except KeyError:
+		name = _names[key] = key if ':' in key else 'android:' + key
+		return name
+
+_escapes = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'),
+	('\n', '&#10;'), ('\r', '&#13;'), ('\t', '&#09;'))
+
+def _escape(value):
+	'''VALUE quoted for a xml attribute'''
+	if bytes is str and not isinstance(value, str):
+		# python 2 unicode, the layout is utf-8 encoded str
+		value = value.encode('utf-8')
+	for c, entity in _escapes:
+		if c in value: value = value.replace(c, entity)
+	return value
+
+
+class _View(object):
+	'''View element
+
+	a compact tree node with the commonly used part of ElementTree.Element api,
+	properties are kept by name without android: prefix'''
 	widgetName = ''
 	defaultConfig = {}
+	# properties the user can change on screen, always pushed
+	volatileConfig = ()
+	# __dict__ is only allocated if other attributes are set
+	__slots__ = ('_attrs', '_own', '_children', '_parent', '_xml', 'droid', 'master', 'root', 'id',
+		'_list', '_listSent', '_shadow', '_shadowShow', '__dict__', '__weakref__')
 
 	def __init__(self, master = None, cnf = {}, pos = None, **kw):
 		'''MASTER parent of the view
 		CNF view element configure
 		POS position to insert in the parent view, at the end if None'''
-		ET._Element.__init__(self, self.widgetName, {})
+		# {property: value}, shared with views of same properties, never changed
+		self._attrs = {}
+		# {property: value} set on this view only, over _attrs
+		self._own = None
+		# child views, and plain elements such as requestFocus
+		self._children = []
+		# serialized xml of this subtree, None if changed since
+		self._xml = None
+		# parent view, None for the root
+		self._parent = None
+		self.id = None
 
 		# used by fullSetList
 		self._list = None
-
-		# combine all configure together
-		cnf = cnf.copy()
+		# (fullShow count, copy of the list) last sent by fullSetList
+		self._listSent = None
+		# values on screen of properties changed since last fullShow
+		self._shadow = None
+		self._shadowShow = None
+
+		# combine all configure together, by property name so defaults don't
+		# come in beside the same property given with android: prefix
+		cnf = dict([(k[8:] if k.startswith('android:') else k, v) for k, v in cnf.items()])
 		for k, v in self.defaultConfig.items():
 			cnf.setdefault(k, v)
 		if len(kw): cnf.update(kw)
@@ -322,31 +585,166 @@ class _View(ET._Element):
 		if 'id' in cnf:
 			self.setid(cnf['id'])
 			del cnf['id']
-		else: self.setid('%s#%x' % (self.widgetName, id(self)) )
-
-		self.config(**cnf)
+		else: self.setid(self.droid._genid(self.widgetName))
+
+		# a subclass may handle some properties in its own configure()
+		if getattr(self.configure, '__func__', None) is _View.__dict__['configure']:
+			if 'command' in cnf:
+				self.droid.reg_click_cb(self.id, cnf.pop('command'))
+			self._attrs = _attrset(cnf)
+			self.droid._isLayoutDirty = True
+		else:
+			self.config(**cnf)
 
 	def set(self, key, value):
 		'''Override the default set(). DON NOT call this'''
-		if key.find(':') == -1: key = "android:%s" % key
-		ET._Element.set(self, key, stringlize(value))
+		if key.startswith('android:'): key = key[8:]
+		if key == 'id':
+			return self.setid(value[value.find('/') + 1:])
+		if self._own is None: self._own = {}
+		self._own[key] = stringlize(value)
+		self._invalidate()
 
 	def get(self, key, default = None):
 		'''Override the default get(). DON NOT call this'''
-		return ET._Element.get(self, "android:%s" % key, default)
+		if key.startswith('android:'): key = key[8:]
+		if key == 'id':
+			return '@+id/' + self.id if self.id else default
+		if self._own is not None and key in self._own:
+			return self._own[key]
+		return self._attrs.get(key, default)
+
+	def _properties(self):
+		'''{property: value} of this view, without id'''
+		if not self._own: return self._attrs
+		attrs = self._attrs.copy()
+		attrs.update(self._own)
+		return attrs
+
+	@property
+	def tag(self):
+		return self.widgetName
+
+	@property
+	def attrib(self):
+		'''copy of xml attributes'''
+		return dict(self.items())
+
+	def keys(self):
+		return [k for k, v in self.items()]
+
+	def items(self):
+		return [('android:id', '@+id/' + self.id)] + [(_attrname(k), v) for k, v in self._properties().items()]
+
+	def __len__(self):
+		return len(self._children)
+
+	def __bool__(self):
+		return True
+	__nonzero__ = __bool__
+
+	def __iter__(self):
+		return iter(self._children)
+
+	def __getitem__(self, index):
+		return self._children[index]
+
+	def iter(self, tag = None):
+		'''iterate over this view and all views below it'''
+		if tag is None or tag == self.widgetName:
+			yield self
+		for child in self._children:
+			if isinstance(child, _View):
+				for view in child.iter(tag):
+					yield view
+
+	def getchildren(self):
+		return list(self._children)
+
+	def find(self, tag):
+		'''first child with tag TAG, only plain tags are supported'''
+		for child in self._children:
+			if tag == '*' or child.tag == tag:
+				return child
+		return None
+
+	def findall(self, tag):
+		'''children with tag TAG, only plain tags are supported'''
+		return [child for child in self._children if tag == '*' or child.tag == tag]
+
+	def append(self, element):
+		self._children.append(element)
+		self._adopt(element)
+
+	def extend(self, elements):
+		for element in elements:
+			self.append(element)
+
+	def insert(self, index, element):
+		self._children.insert(index, element)
+		self._adopt(element)
+
+	def remove(self, element):
+		self._children.remove(element)
+		if isinstance(element, _View): element._parent = None
+		self._invalidate()
+		self.droid._setdirty()
+
+	def _adopt(self, element):
+		if isinstance(element, _View): element._parent = self
+		self._invalidate()
+		self.droid._setdirty()
+
+	def _invalidate(self):
+		'''drop cached xml of this view and its parents'''
+		view = self
+		# parents of a view without cache have no cache either
+		while view is not None and view._xml is not None:
+			view._xml = None
+			view = view._parent
+
+	def _tostring(self):
+		'''xml of this subtree, only changed views are serialized again'''
+		if self._xml is None:
+			attrs = ' android:id="@+id/%s"%s' % (_escape(self.id),
+				''.join([' %s="%s"' % (_attrname(k), _escape(v)) for k, v in sorted(self._properties().items())]))
+			if self._children:
+				children = [child._tostring() if isinstance(child, _View) else ET.tostring(child, XML_ENCODING)
+					for child in self._children]
+				self._xml = '<%s%s>%s</%s>' % (self.widgetName, attrs, ''.join(children), self.widgetName)
+			else:
+				self._xml = '<%s%s />' % (self.widgetName, attrs)
+		return self._xml
 
 	def setid(self, id):
 		'''set widget id'''
-		if hasattr(self, 'id') and self.id:
+		if self.id:
 			self.droid.unreg_obj(self.id)
 		self.id = id
-		self.set('id', '@+id/' + id)
+		self._invalidate()
 		self.droid.reg_obj(id, self)
+		self.droid._setdirty()
 
 	def setlist(self, list):
-		'''Attach a list to widget'''
+		'''Attach a list to widget, LIST may be a ListAdapter to show it a window at a time
+		a list equal to the one on screen is not sent again. once a ListAdapter
+		is attached, lists set later replace its items, so growing lists
+		only send the items falling in the shown window'''
 		if self.droid.showed:
-			self.droid.call('fullSetList', self.id, list)
+			sent = self._listSent
+			onscreen = sent is not None and sent[0] == self.droid._shows
+			if isinstance(list, ListAdapter):
+				if onscreen and list is self._list:
+					list.assign(list.items)
+				else:
+					list._attach(self)
+				self._listSent = (self.droid._shows, None)
+			elif onscreen and isinstance(self._list, ListAdapter):
+				self._list.assign(list)
+				return
+			elif not onscreen or sent[1] != list:
+				self.droid.call('fullSetList', self.id, list)
+				self._listSent = (self.droid._shows, list[:])
 			self._list = list
 		else:
 			warnings.warn('method called when layout not showed')
@@ -360,8 +758,8 @@ class _View(ET._Element):
 
 	def _setroot(self, root):
 		self.root = root
-		for child in self:
-			child._setroot(root)
+		for child in self._children:
+			if isinstance(child, _View): child._setroot(root)
 
 	def key(self, key, handler):
 		'''set key handler'''
@@ -376,9 +774,15 @@ class _View(ET._Element):
 		if self.droid.showed: warnings.warn('focus required after showed: %s', str(self))
 		else: self.append(ET.Element('requestFocus', {}))
 
+	def _shadowed(self):
+		'''values on screen of changed properties, reset by fullShow'''
+		if self._shadowShow != self.droid._shows or self._shadow is None:
+			self._shadow = {}
+			self._shadowShow = self.droid._shows
+		return self._shadow
+
 	def _property(self, key, value):
-		if not self.droid.showed: return
-		self.droid.call('fullSetProperty', self.id, key, stringlize(value))
+		return self.droid.call('fullSetProperty', self.id, key, stringlize(value))
 
 	def configure(self, **kw):
 		'''configure view properties'''
@@ -386,26 +790,47 @@ class _View(ET._Element):
 		if 'command' in kw:
 			self.droid.reg_click_cb(self.id, kw['command'])
 			del kw['command']
-		showed = self.droid.showed
+		since = self.droid._sinceShow.setdefault(self, {}) if self.droid._xmlShown is not None else {}
+		if DroidUi._onscreen is not self.droid:
+			# not on screen, next fullShow shows them all
+			for k, v in kw.items():
+				self.set(k, v)
+				since[k] = stringlize(v)
+			self.droid._isLayoutDirty = True
+			return
+		shadow = self._shadowed()
 		for k, v in kw.items():
+			v = stringlize(v)
+			since[k] = v
+			# the value on screen is the one showed, until it's changed
+			if k not in shadow: shadow[k] = self.get(k)
 			self.set(k, v)
-			self.droid._setdirty()
-			if showed:
-				# ignore exception for `show-time' created views
-				# SL4A don't know there IDs in this case
-				try: self._property(k, v)
-				except: pass
+			if v == shadow[k] and k not in self.volatileConfig:
+				self.droid._setunchanged(self, k)
+			else:
+				self.droid._setchanged(self, k, v)
+		# inside a frame, pushed when the frame ends
+		if self.droid.showed and not self.droid._frame:
+			self.droid._pushChanges()
 	config = configure
 
 	def cget(self, key, default = None):
 		'''get property value'''
-		value = None
-		if self.droid.showed:
-			try: value = self.droid.call('fullQueryDetail', self.id)[key]
-			except KeyError: pass
-		if value is None:
-			value = self.get(key, default)
-		return value
+		return self.cget_many((key,), default)[key]
+
+	def cget_many(self, keys, default = None):
+		'''get values of properties KEYS as {key: value}, with one fullQueryDetail at most
+		in a frame, e.g. an event handler, the query is done once for all calls'''
+		detail = self.droid._detail(self) if self.droid.showed else {}
+		# set in current frame, not pushed yet
+		changed = self.droid._changed.get(self) or {}
+		values = {}
+		for key in keys:
+			value = changed[key] if key in changed else detail.get(key)
+			if value is None:
+				value = self.get(key, default)
+			values[key] = value
+		return values
 
 	def mainloop(self, title = None):
 		self.droid.mainloop(title)
@@ -453,9 +878,11 @@ class ProgressBar(View):
 
 class _AbsSeekBar(ProgressBar):
 	widgetName = 'AbsSeekBar'
+	volatileConfig = ('progress',)
 
 class RatingBar(_AbsSeekBar):
 	widgetName = 'RatingBar'
+	volatileConfig = ('progress', 'rating')
 
 class SeekBar(_AbsSeekBar):
 	widgetName = 'SeekBar'
@@ -487,6 +914,7 @@ class Button(TextView):
 
 class CompoundButton(Button):
 	widgetName = 'CompoundButton'
+	volatileConfig = ('checked',)
 
 class CheckBox(CompoundButton):
 	widgetName = 'CheckBox'
@@ -502,6 +930,7 @@ class ToggleButton(CompoundButton):
 
 class CheckedTextView(TextView):
 	widgetName = 'CheckedTextView'
+	volatileConfig = ('checked',)
 
 class Chronometer(TextView):
 	widgetName = 'Chronometer'
@@ -511,6 +940,7 @@ class DigitalClock(TextView):
 
 class EditText(TextView):
 	widgetName = 'EditText'
+	volatileConfig = ('text',)
 	defaultConfig = {
 		'layout_width': MATCH_PARENT,
 		'layout_height': WRAP_CONTENT,
@@ -688,6 +1118,538 @@ class ViewStub(View):
 	widgetName = 'ViewStub'
 
 
+#####################################################################
+# xml loader
+
+# iterparse events read by the loader
+_EVENTS = ('start', 'end', 'start-ns')
+
+# namespace uri -> prefix, for attributes outside android namespace
+_namespaces = {
+	'http://www.w3.org/XML/1998/namespace': 'xml',
+	'http://schemas.android.com/tools': 'tools',
+	'http://schemas.android.com/apk/res-auto': 'app',
+}
+
+def _prefix(uri, prefix = None):
+	'''prefix of namespace URI in layouts, PREFIX is the one the document uses'''
+	try:
+		return _namespaces[uri]
+	except KeyError:
+		pass
+	used = set(_namespaces.values())
+	if not prefix or prefix in used:
+		n = 0
+		while 'ns%d' % n in used: n += 1
+		prefix = 'ns%d' % n
+	# python 2 parser gives unicode
+	prefix = _namespaces[uri] = str(prefix)
+	return prefix
+
+# attribute name in xml -> interned property name
+_keys = {}
+
+def _key(name):
+	'''property name of xml attribute NAME, without android namespace
+	attributes of other namespaces are named prefix:name, e.g. tools:context'''
+	try:
+		return _keys[name]
+	except KeyError:
+		pass
+	key = name
+	if key.startswith('{%s}' % DroidUi.NAMESPACE):
+		key = key[len(DroidUi.NAMESPACE) + 2:]
+	elif key.startswith('{'):
+		uri, local = key[1:].split('}', 1)
+		key = '%s:%s' % (_prefix(uri), local)
+	key = _keys[name] = _intern(key)
+	return key
+
+# xml tag -> view class
+_views = {}
+
+def _register(cls):
+	'''register CLS and its subclasses by widgetName, first one wins'''
+	if 'widgetName' in cls.__dict__:
+		_views.setdefault(cls.widgetName, cls)
+	for sub in cls.__subclasses__():
+		_register(sub)
+
+def _viewclass(tag):
+	'''view class of xml TAG'''
+	cls = _views.get(tag)
+	if cls is None:
+		# views subclassed by user after import
+		_register(_View)
+		cls = _views.get(tag)
+		if cls is None:
+			raise ValueError('unknown view in layout: <%s>' % tag)
+	return cls
+
+_register(_View)
+
+
+#####################################################################
+# layout templates
+
+def _rebind(obj, clones):
+	'''OBJ with prototype objects replaced by their clones
+	CLONES maps id() of prototype objects to their clones'''
+	clone = clones.get(id(obj))
+	if clone is not None:
+		return clone
+	if isinstance(obj, list):
+		return [_rebind(item, clones) for item in obj]
+	if isinstance(obj, tuple):
+		return tuple([_rebind(item, clones) for item in obj])
+	if isinstance(obj, dict):
+		return dict([(k, _rebind(v, clones)) for k, v in obj.items()])
+	self = getattr(obj, '__self__', None)
+	if self is not None and id(self) in clones and hasattr(obj, '__func__'):
+		return types.MethodType(obj.__func__, clones[id(self)])
+	return obj
+
+def _refers(obj, protos):
+	'''if OBJ refers to an object in PROTOS, a set of id()'''
+	if id(obj) in protos:
+		return True
+	if isinstance(obj, (list, tuple)):
+		for item in obj:
+			if _refers(item, protos): return True
+		return False
+	if isinstance(obj, dict):
+		for item in obj.values():
+			if _refers(item, protos): return True
+		return False
+	return id(getattr(obj, '__self__', None)) in protos
+
+# attributes of these types are copied for every new layout, other objects are shared
+_MUTABLE = (list, dict, set, bytearray)
+
+def _idref(value):
+	'''(prefix, id) if VALUE refers to a view id, e.g. @id/name'''
+	if isstring(value) and (value.startswith('@id/') or value.startswith('@+id/')):
+		pos = value.find('/') + 1
+		return value[:pos], value[pos:]
+
+
+class Template(object):
+	'''a layout built once, copied to make new layouts
+
+	the prototype layout is built once, new() copies its views without
+	running __init__ and configure again. views with generated ids get new
+	ones, callbacks and attributes referring to the prototype layout or
+	its views are bound to the copies. xml of subtrees without generated
+	ids is shared with the prototype, so it is not serialized again.
+	properties referring to generated ids, e.g. layout_below, refer to the
+	new ids. attributes of the layout and its views that are lists, dicts
+	or sets are copied shallowly, other objects are shared by all copies
+
+	row = Template.fromfile('row.xml')
+	layout = row.new()
+	game = Template(GameLayout)
+
+	SOURCE - a DroidUi layout, or a callable returning one'''
+	def __init__(self, source):
+		proto = source if isinstance(source, DroidUi) else source()
+		# serialize once, every view caches its xml
+		proto.updateLayout()
+		self.proto = proto
+		# [view, parent index, id is generated, subtree xml can be shared,
+		#  attributes to bind, attributes to copy, properties referring to generated ids]
+		# in document order
+		self._nodes = []
+		self._compile(proto._root, -1)
+		# attributes to be bound to the copies, of every view and the layout
+		protos = set([id(proto)] + [id(node[0]) for node in self._nodes])
+		generated = set([node[0].id for node in self._nodes if node[2]])
+		for index, node in enumerate(self._nodes):
+			view = node[0]
+			node.append([k for k, v in view.__dict__.items() if _refers(v, protos)])
+			node.append([k for k, v in view.__dict__.items() if k not in node[4] and isinstance(v, _MUTABLE)])
+			refs = []
+			for k, v in view._properties().items():
+				ref = _idref(v)
+				if ref and ref[1] in generated:
+					refs.append((k, ref[0], ref[1]))
+			node.append(refs)
+			# its xml changes in every copy
+			while refs and index >= 0 and self._nodes[index][3]:
+				self._nodes[index][3] = False
+				index = self._nodes[index][1]
+		self._attrs = [(k, _refers(v, protos)) for k, v in proto.__dict__.items()]
+
+	@staticmethod
+	def fromxml(xml):
+		'''template of a string contains xml data'''
+		return Template(DroidUi.fromxml(xml))
+
+	@staticmethod
+	def fromfile(source):
+		'''template of a xml file, SOURCE may be a filename or file object'''
+		return Template(DroidUi.fromfile(source))
+
+	def _compile(self, view, parent):
+		prefix = view.widgetName + '#'
+		generated = view.id.startswith(prefix) and view.id[len(prefix):].isdigit()
+		node = [view, parent, generated, not generated]
+		index = len(self._nodes)
+		self._nodes.append(node)
+		for child in view:
+			if isinstance(child, _View) and not self._compile(child, index):
+				node[3] = False
+		return node[3]
+
+	def new(self):
+		'''a new layout, copied from the prototype'''
+		proto = self.proto
+		droid = proto.__class__.__new__(proto.__class__)
+		DroidUi.__init__(droid)
+		clones = {id(proto): droid}
+		ids = {}
+		views = []
+		for view, parent, generated, static, binds, copies, refs in self._nodes:
+			cls = view.__class__
+			clone = cls.__new__(cls)
+			if view.__dict__: clone.__dict__.update(view.__dict__)
+			clone._attrs = view._attrs
+			clone._own = dict(view._own) if view._own else None
+			clone._children = []
+			clone.root = views[0] if views else clone
+			clone.droid = droid
+			clone._list = None
+			clone._listSent = None
+			clone._shadow = None
+			clone._shadowShow = None
+			clone._xml = view._xml if static else None
+			if generated:
+				clone.id = droid._genid(clone.widgetName)
+				ids[view.id] = clone.id
+			else:
+				clone.id = view.id
+			droid.objmap[clone.id] = clone
+			if parent < 0:
+				clone._parent = None
+				clone.master = droid
+			else:
+				master = views[parent]
+				master._children.append(clone)
+				clone._parent = clone.master = master
+			# e.g. requestFocus
+			for child in view:
+				if not isinstance(child, _View):
+					clone._children.append(ET.Element(child.tag, child.attrib))
+			clones[id(view)] = clone
+			views.append(clone)
+
+		for clone, node in zip(views, self._nodes):
+			for k in node[4]:
+				clone.__dict__[k] = _rebind(clone.__dict__[k], clones)
+			for k in node[5]:
+				clone.__dict__[k] = copy.copy(clone.__dict__[k])
+			if node[6]:
+				if clone._own is None: clone._own = {}
+				for k, prefix, ref in node[6]:
+					clone._own[k] = prefix + ids[ref]
+		attrs = droid.__dict__
+		for k, refers in self._attrs:
+			if k not in attrs:
+				v = proto.__dict__[k]
+				if refers: v = _rebind(v, clones)
+				elif isinstance(v, _MUTABLE): v = copy.copy(v)
+				attrs[k] = v
+		droid._root = _rebind(proto._root, clones)
+		droid._oldroot = _rebind(proto._oldroot, clones)
+		droid.title = proto.title
+		droid._click_cb = dict([(ids.get(k, k), _rebind(v, clones)) for k, v in proto._click_cb.items()])
+		droid._key_cb = dict([(k, _rebind(v, clones)) for k, v in proto._key_cb.items()])
+		droid._handler = dict([(k, _rebind(v, clones)) for k, v in proto._handler.items()])
+		droid._optionMenu = list(proto._optionMenu)
+		return droid
+
+
+#####################################################################
+# layout state
+
+class Snapshot(Mapping):
+	'''state of the views on screen, read by one fullQuery call
+
+	a read only mapping of view id -> {property: value}, views may be
+	used as keys too. properties set but not pushed yet are included,
+	as cget() does
+
+	snap = droid.snapshot()
+	name = snap.value(nameEdit, 'text')
+	city = snap.selected(citySpinner)'''
+	def __init__(self, droid, state):
+		self.droid = droid
+		self._state = state
+
+	def __getitem__(self, key):
+		id = key.id if isinstance(key, _View) else key
+		properties = dict(self._state[id])
+		view = self.droid.objmap.get(id)
+		if view is not None:
+			properties.update(self.droid._changed.get(view) or {})
+		return properties
+
+	def __contains__(self, key):
+		return (key.id if isinstance(key, _View) else key) in self._state
+
+	def __iter__(self):
+		return iter(self._state)
+
+	def __len__(self):
+		return len(self._state)
+
+	def value(self, view, key, default = None):
+		'''property KEY of VIEW, a view or id, from the layout if not on screen'''
+		if not isinstance(view, _View): view = self.droid.objmap[view]
+		value = self[view].get(key) if view in self else None
+		if value is None:
+			value = view.get(key, default)
+		return value
+
+	def selected(self, view):
+		'''the selected item of the list attached to VIEW'''
+		if not isinstance(view, _View): view = self.droid.objmap[view]
+		if view._list is not None:
+			pos = self.value(view, 'selectedItemPosition')
+			if pos is not None:
+				return view._list[int(pos)]
+
+
+#####################################################################
+# list adapter
+
+class ListAdapter(object):
+	'''a long list shown a window at a time in a ListView or Spinner
+
+	only the first WINDOW items are sent by fullSetList, followed by a
+	MORE row while some are left out. clicking the MORE row, or calling
+	more(), shows WINDOW items more. items appended are sent only when
+	they fall in the shown part, so a growing log costs nothing until
+	it's scrolled to. positions are those of the list on screen, the
+	MORE row has no item. changes made while the layout isn't on screen
+	are sent when it's showed again
+
+	sms = ListAdapter(messages, label = lambda m: m['body'])
+	listview.setlist(sms)
+	sms.append(message)
+
+	ITEMS  - a list, used as it is, not copied
+	WINDOW - number of items shown at first and added by each more()
+	MORE   - text of the row that loads more items
+	LABEL  - function of an item returns its text, items are sent as they are if None'''
+	def __init__(self, items = None, window = 100, more = 'Load more...', label = None):
+		self.items = items if items is not None else []
+		self.window = window
+		self.moretext = more
+		self.label = label
+		# number of items may be shown, grows by WINDOW
+		self.limit = window
+		# texts of items on screen
+		self._rows = []
+		self._more = False
+		self.view = None
+		# changed while the layout wasn't on screen
+		self._dirty = False
+
+	def __len__(self):
+		return len(self.items)
+
+	def __getitem__(self, position):
+		'''item at POSITION of the list on screen, None for the MORE row'''
+		if self._more and position == len(self._rows):
+			return None
+		if position >= len(self._rows):
+			raise IndexError('list position out of range: %d' % position)
+		return self.items[position]
+
+	def __iter__(self):
+		return iter(self.items)
+
+	def _attach(self, view):
+		'''show the list in VIEW'''
+		self.view = view
+		self._rows = []
+		self._update(True)
+
+	def _update(self, force = False):
+		'''send the shown part again if it has changed'''
+		rows = self._rows
+		shown = min(self.limit, len(self.items))
+		more = len(self.items) > shown
+		if shown == len(rows) and more == self._more and not force:
+			return
+		del rows[shown:]
+		label = self.label
+		added = self.items[len(rows):shown]
+		rows.extend([label(item) for item in added] if label else added)
+		self._more = more
+		self._send()
+
+	def _send(self):
+		'''send the shown part, or keep it for the next show() if the layout isn't on screen'''
+		view = self.view
+		if view is None: return
+		if view.droid.showed and DroidUi._onscreen is view.droid:
+			rows = self._rows
+			view.droid.call('fullSetList', view.id, rows + [self.moretext] if self._more else rows)
+			view._listSent = (view.droid._shows, None)
+			self._dirty = False
+		else:
+			self._dirty = True
+
+	def assign(self, items):
+		'''replace all items by ITEMS, sent only if the shown part changes'''
+		self.items = items
+		shown = min(self.limit, len(items))
+		more = len(items) > shown
+		label = self.label
+		rows = [label(item) for item in items[:shown]] if label else list(items[:shown])
+		if rows != self._rows or more != self._more:
+			self._rows = rows
+			self._more = more
+			self._send()
+
+	def ismore(self, position):
+		'''if POSITION is the MORE row'''
+		return self._more and position == len(self._rows)
+
+	def more(self):
+		'''show WINDOW items more, return False if all are shown'''
+		if not self._more:
+			return False
+		self.limit = len(self._rows) + self.window
+		self._update()
+		return True
+
+	def append(self, item):
+		'''add ITEM to the end, sent if it's in the shown part'''
+		self.items.append(item)
+		self._update()
+
+	def extend(self, items):
+		'''add ITEMS to the end, those in the shown part are sent'''
+		self.items.extend(items)
+		self._update()
+
+	def reset(self, items = None):
+		'''replace all items, or show the first window only if ITEMS is None'''
+		if items is not None:
+			self.items = items
+		self.limit = self.window
+		self._rows = []
+		self._update(True)
+
+
+#####################################################################
+# navigation
+
+class _Prebuild(object):
+	'''a layout built on a worker thread'''
+	def __init__(self, factory, idle):
+		self.layout = None
+		self.error = None
+		self.thread = threading.Thread(target = self._build, args = (factory, idle))
+		self.thread.daemon = True
+		self.thread.start()
+
+	def _build(self, factory, idle):
+		# let the current screen show and settle first
+		idle.wait()
+		try:
+			layout = factory()
+			droid = layout if isinstance(layout, DroidUi) else getattr(layout, 'droid', None)
+			if isinstance(droid, DroidUi): droid.updateLayout()
+			self.layout = layout
+		except Exception:
+			self.error = sys.exc_info()
+
+	def result(self):
+		self.thread.join()
+		if self.error is not None:
+			raise self.error[1]
+		return self.layout
+
+
+class Navigator(object):
+	'''stack of layouts showed by nested mainloop() calls
+
+	the layout on top is on screen, when its mainloop returns the one
+	below is showed again. layouts that may come next can be declared
+	with prebuild(), they are built and serialized on a worker thread
+	while the current layout waits for events, so opening one costs a
+	fullShow only
+
+	navigator.prebuild(AddressForm)
+	...
+	navigator.open(AddressForm)
+
+	a FACTORY is a callable returning a DroidUi layout, or a view or any
+	object with a mainloop() method, e.g. a DroidUi subclass'''
+	def __init__(self):
+		self.stack = []
+		self._lock = threading.Lock()
+		# factory -> _Prebuild
+		self._prebuilt = {}
+		# set while the layout on top waits for events
+		self._idle = threading.Event()
+
+	@property
+	def top(self):
+		'''layout on screen, None if there's none'''
+		return self.stack[-1] if self.stack else None
+
+	def push(self, droid):
+		'''DROID is showed over the current layout, return its depth'''
+		self.stack.append(droid)
+		return len(self.stack) - 1
+
+	def pop(self):
+		'''remove the layout on top, return the one below'''
+		self.stack.pop()
+		return self.top
+
+	def prebuild(self, factory):
+		'''build FACTORY() in background, once the current layout is idle
+		does nothing if it's prebuilt already'''
+		with self._lock:
+			if factory not in self._prebuilt:
+				self._prebuilt[factory] = _Prebuild(factory, self._idle)
+
+	def take(self, factory):
+		'''the layout prebuilt by FACTORY, built now if it isn't
+		a prebuilt layout is handed out once, prebuild() again for another'''
+		with self._lock:
+			prebuilt = self._prebuilt.pop(factory, None)
+		if prebuilt is None:
+			return factory()
+		# waiting here is idle as well, a build not started yet starts now
+		idle = self._idle.is_set()
+		self._idle.set()
+		try:
+			return prebuilt.result()
+		finally:
+			if not idle: self._idle.clear()
+
+	def open(self, factory, title = None):
+		'''show the layout of FACTORY over the current one, and run its mainloop'''
+		layout = self.take(factory)
+		if title is None: layout.mainloop()
+		else: layout.mainloop(title)
+		return layout
+
+	def idle(self, idle):
+		'''called by the event loop, IDLE is True before waiting for an event'''
+		if idle: self._idle.set()
+		else: self._idle.clear()
+
+# layouts showed by mainloop()
+navigator = Navigator()
+
+
 #####################################################################
 # test code
 
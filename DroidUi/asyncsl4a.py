@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2012-2014 Tommy Alex. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+# asyncsl4a.py
+# asyncio counterpart of sl4a.sl4a
+#
+# needs python 3.6 or above, so it is not imported by `import DroidUi'
+# use `from DroidUi.asyncsl4a import AsyncSl4a' instead
+
+
+import asyncio
+from .sl4a import sl4aError, HOST, PORT, HANDSHAKE
+from .transport import getcodec
+
+# longest response line, fullQuery of a big layout or smsGetMessages may take megabytes
+LIMIT = 64 * 1024 * 1024
+
+
+class AsyncSl4a(object):
+	'''sl4a client built on asyncio streams
+
+	every rpc call returns an awaitable future, many calls can be in flight
+	at the same time, responses are matched back by JSON-RPC id
+
+	droid = await AsyncSl4a().connect()
+	id, name = await asyncio.gather(droid.getDeviceId(), droid.getNetworkOperatorName())
+	async for event in droid.events():
+		...
+	'''
+	def __init__(self, addr = None, codec = None):
+		if addr is None:
+			addr = HOST, PORT
+		self.addr = addr
+		self.codec = codec or getcodec()
+		self.id = 0
+		self._pending = {}
+		self._loop = None
+		self._reader = None
+		self._writer = None
+		self._task = None
+
+	def __getattr__(self, name):
+		def rpc_call(*args):
+			return self._call(name, args)
+		return rpc_call
+
+	async def __aenter__(self):
+		return await self.connect()
+
+	async def __aexit__(self, *exc):
+		await self.close()
+
+	async def connect(self):
+		'''open the connection and start the response dispatcher'''
+		self._loop = asyncio.get_event_loop()
+		self._reader, self._writer = await asyncio.open_connection(*self.addr, limit = LIMIT)
+		self._task = self._loop.create_task(self._dispatch())
+		if HANDSHAKE is not None:
+			await self._authenticate(HANDSHAKE)
+		return self
+
+	async def close(self):
+		'''close the connection, pending calls fail with sl4aError'''
+		if self._writer is None: return
+		self._writer.close()
+		self._writer = None
+		await self._task
+
+	def _call(self, method, args):
+		'''send a request, return a future resolved by the response with same id'''
+		if self._writer is None:
+			raise sl4aError('%s: not connected' % method)
+		id = self.id
+		self.id += 1
+		future = self._loop.create_future()
+		self._pending[id] = future
+		self._writer.write(self.codec.dumps({'id': id, 'method': method, 'params': args}) + b'\n')
+		return future
+
+	async def _dispatch(self):
+		'''read responses, resolve the waiting future by id'''
+		error = 'connection closed'
+		try:
+			while True:
+				line = await self._reader.readline()
+				if not line: break
+				r = self.codec.loads(line)
+				future = self._pending.pop(r['id'], None)
+				if future is None or future.done(): continue
+				if r['error']:
+					future.set_exception(sl4aError(r['error']))
+				else:
+					future.set_result(r['result'])
+		except (ConnectionError, asyncio.CancelledError):
+			pass
+		except ValueError as e:
+			# a line longer than LIMIT, or not json
+			error = 'connection closed: %s' % e
+		finally:
+			# later calls raise instead of waiting for a response never read
+			writer, self._writer = self._writer, None
+			if writer is not None: writer.close()
+			pending, self._pending = self._pending, {}
+			for future in pending.values():
+				if not future.done():
+					future.set_exception(sl4aError(error))
+
+	async def events(self, port = 0):
+		'''async iterator over device events, like a endless eventWait()
+		events are pushed through an event dispatcher socket,
+		so waiting for them never takes a rpc slot of this connection
+		PORT - port of the dispatcher, 0 to let the server choose one'''
+		port = await self.startEventDispatcher(port)
+		reader, writer = await asyncio.open_connection(self.addr[0], port, limit = LIMIT)
+		try:
+			while True:
+				line = await reader.readline()
+				if not line: break
+				yield self.codec.loads(line)
+		finally:
+			writer.close()
+			if self._writer is not None:
+				try: await self.stopEventDispatcher()
+				except sl4aError: pass
@@ -20,23 +20,856 @@
 # Create: 2012-02-05 23:36
 
 
-from android import *
+import os
+import time
+import bisect
+import socket
+import threading
+from collections import namedtuple, deque
+from contextlib import contextmanager
+from .sl4aRpc import sl4aRpc
+from . import transport
+
+try:
+	from android import Android, Result, HOST, PORT, HANDSHAKE
+except ImportError:
+	# not on the device, e.g. replaying a recorded session
+	Android = object
+	Result = namedtuple('Result', 'id,result,error')
+	HOST = os.environ.get('AP_HOST')
+	PORT = os.environ.get('AP_PORT')
+	HANDSHAKE = os.environ.get('AP_HANDSHAKE')
 
 
 class sl4aError(Exception):
 	pass
 
 
-class sl4a(Android):
-	'''make the android.Android class more pythonic'''
+class sl4aTimeout(sl4aError):
+	'''rpc call not answered before its deadline'''
+	pass
+
+
+# high resolution timer, python 2 only has time.time()
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+class sl4aMonitor(object):
+	'''per method rpc statistics: call count, errors, latency histogram,
+	request and response size. disabled by default, enable() to start recording
+
+	from DroidUi.sl4a import monitor
+	monitor.enable()
+	...
+	print(monitor.report())'''
+	# upper bounds of latency histogram buckets, in ms
+	BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+
+	def __init__(self):
+		self.enabled = False
+		self._lock = threading.Lock()
+		self._data = {}
+
+	def enable(self, enabled = True):
+		self.enabled = enabled
+
+	def disable(self):
+		self.enabled = False
+
+	def record(self, method, latency, sent, received, error = None):
+		'''record one call, LATENCY in seconds, SENT and RECEIVED in bytes'''
+		ms = latency * 1000
+		with self._lock:
+			d = self._data.get(method)
+			if d is None:
+				d = self._data[method] = {
+					'count': 0,
+					'errors': 0,
+					'time': 0.0,
+					'max': 0.0,
+					'sent': 0,
+					'received': 0,
+					'histogram': [0] * len(self.BUCKETS),
+				}
+			d['count'] += 1
+			if error: d['errors'] += 1
+			d['time'] += ms
+			if ms > d['max']: d['max'] = ms
+			d['sent'] += sent
+			d['received'] += received
+			d['histogram'][bisect.bisect_left(self.BUCKETS, ms)] += 1
+
+	def stats(self):
+		'''snapshot of statistics, a dict of method name to
+		count, errors, time (total ms), max (ms), sent, received (bytes),
+		and histogram, a list of (bucket upper bound in ms, count)'''
+		with self._lock:
+			snapshot = {}
+			for method, d in self._data.items():
+				d = d.copy()
+				d['histogram'] = list(zip(self.BUCKETS, d['histogram']))
+				snapshot[method] = d
+			return snapshot
+
+	def reset(self):
+		'''clear all statistics'''
+		with self._lock:
+			self._data = {}
+
+	def report(self):
+		'''statistics as text, slowest method first'''
+		lines = ['%-28s %7s %6s %10s %9s %10s %10s' % ('method', 'count', 'errors', 'total ms', 'max ms', 'sent', 'received')]
+		stats = sorted(self.stats().items(), key = lambda item: -item[1]['time'])
+		for method, d in stats:
+			lines.append('%-28s %7d %6d %10.1f %9.1f %10d %10d' % (method, d['count'], d['errors'], d['time'], d['max'], d['sent'], d['received']))
+		return '\n'.join(lines)
+
+# statistics of all sl4a connections
+monitor = sl4aMonitor()
+
+
+class sl4aDeadlines(object):
+	'''deadlines of rpc calls in seconds, None waits forever
+
+	deadlines.set('fullShow', 5)       # one method
+	deadlines.set('dialogCreate*', 5)  # all methods start with dialogCreate
+	exact names win over prefixes, longer prefixes win over shorter ones,
+	methods matching none of them get DEFAULT'''
+	def __init__(self, default = None):
+		self.default = default
+		self._methods = {}
+		self._prefixes = {}
+		self._cache = {}
+
+	def set(self, name, seconds):
+		'''set deadline of method NAME, or of a method class if NAME ends with *'''
+		if name.endswith('*'):
+			self._prefixes[name[:-1]] = seconds
+		else:
+			self._methods[name] = seconds
+		self._cache = {}
+
+	def get(self, method):
+		'''deadline of METHOD'''
+		try:
+			return self._cache[method]
+		except KeyError:
+			pass
+		if method in self._methods:
+			seconds = self._methods[method]
+		else:
+			seconds = self.default
+			matched = ''
+			for prefix, value in self._prefixes.items():
+				if method.startswith(prefix) and len(prefix) >= len(matched):
+					seconds, matched = value, prefix
+		self._cache[method] = seconds
+		return seconds
+
+# deadlines of all sl4a connections
+deadlines = sl4aDeadlines()
+# ui calls answer quickly, a stalled server must not hang the ui loop
+for name in ('full*', 'dialogCreate*', 'dialogSet*', 'dialogShow', 'dialogDismiss',
+		'addOptionsMenuItem', 'clearOptionsMenu', 'makeToast', 'notify'):
+	deadlines.set(name, 10)
+# these wait for the user or a remote device
+for name in ('recognizeSpeech', 'scanBarcode', 'pickContact', 'pickPhone'):
+	deadlines.set(name, 300)
+# blocks until the user answers, or has its own timeout argument
+for name in ('dialogGetResponse', 'eventWait*', 'bluetoothAccept', 'bluetoothConnect'):
+	deadlines.set(name, None)
+
+
+class sl4aFuture(object):
+	'''result of a rpc call queued in sl4a.batch()
+	the value is available after the batch is flushed'''
+	def __init__(self, id, method):
+		self.id = id
+		self.method = method
+		self.done = False
+		self.error = None
+		self._result = None
+
+	def _set(self, result, error):
+		self._result = result
+		self.error = error
+		self.done = True
+
+	@property
+	def result(self):
+		'''the rpc result, raise sl4aError if the call failed'''
+		if not self.done:
+			raise sl4aError('%s: batch not flushed yet' % self.method)
+		if self.error:
+			raise sl4aError(self.error)
+		return self._result
+
+
+class sl4a(sl4aRpc, Android):
+	'''make the android.Android class more pythonic
+	known rpc methods are stubs from sl4aRpc, others are looked up dynamically'''
+	monitor = monitor
+	deadlines = deadlines
+	def __init__(self, addr = None, codec = None, prewarm = False):
+		'''the connection is opened on first rpc call, or by connect()
+		ADDR    - (host, port) of the server, from environment if None
+		CODEC   - json codec, see transport.setcodec()
+		PREWARM - if True, start connecting in background right now'''
+		# pending requests of current batch, None if not batching
+		self._batch = None
+		if addr is None:
+			addr = HOST, PORT
+		self.addr = addr
+		self.codec = codec
+		self.id = 0
+		self.transport = None
+		self._connecting = None
+		# deadline of the deadline() block, as (seconds,)
+		self._deadline = None
+		# ids of timed out calls, their late responses are dropped
+		self._abandoned = set()
+		self._events = None
+		if prewarm:
+			self.prewarm()
+
+	def connect(self):
+		'''open the connection now, wait for prewarm() if it is in progress'''
+		thread = self._connecting
+		if thread is not None:
+			thread.join()
+			self._connecting = None
+		if self.transport is None:
+			self._open()
+		return self
+
+	@property
+	def events(self):
+		'''sl4aEvents listener of this connection'''
+		if self._events is None:
+			self._events = sl4aEvents(self)
+		return self._events
+
+	def prewarm(self):
+		'''open the connection in a background thread
+		the first rpc call waits for it, errors are raised from there'''
+		if self.transport is not None or self._connecting is not None: return
+		def connect():
+			try: self._open()
+			except Exception: pass
+		self._connecting = threading.Thread(target = connect)
+		self._connecting.daemon = True
+		self._connecting.start()
+
+	def _open(self):
+		if self.addr[1] is None and transport._replayer is None:
+			raise sl4aError('no sl4a server to connect, AP_PORT is not set')
+		t = transport.connect(self.addr, self.codec)
+		if HANDSHAKE is not None:
+			t.send(t.encode({'id': self.id, 'method': '_authenticate', 'params': [HANDSHAKE]}))
+			self.id += 1
+			r = t.recv()
+			if r['error']:
+				t.close()
+				raise sl4aError(r['error'])
+		# ready only after authenticated
+		self.transport = t
+
+	def __getattr__(self, name):
+		def rpc_call(*args):
+			return self._call(name, args)
+		return rpc_call
+
+	def _call(self, method, args):
+		'''do a rpc call, or queue it if batching'''
+		if self._batch is not None:
+			return self._queue(method, args)
+		r = self._rpc(method, *args)
+		if r.error:
+			raise sl4aError(r.error)
+		return r.result
+
+	def _request(self, method, args):
+		'''encode a request, return its id and the request line'''
+		if self.transport is None:
+			self.connect()
+		id = self.id
+		self.id += 1
+		return id, self.transport.encode({'id': id, 'method': method, 'params': args})
+
+	def _timeout(self, method):
+		if self._deadline is not None:
+			return self._deadline[0]
+		return self.deadlines.get(method)
+
+	def _send(self, data, timeout = None):
+		'''write request lines to server'''
+		try:
+			self.transport.send(data, timeout)
+		except socket.timeout:
+			# a request may be cut in the middle, never reuse the stream
+			self.transport.close()
+			self.transport = None
+			raise sl4aTimeout('request not sent in %s seconds' % timeout)
+
+	def _recv(self, deadline = None):
+		'''read one response from server, skip responses of timed out calls'''
+		while True:
+			timeout = None if deadline is None else max(deadline - _clock(), 0)
+			r = self.transport.recv(timeout)
+			if r['id'] in self._abandoned:
+				self._abandoned.discard(r['id'])
+				continue
+			return r
+
+	def _exchange(self, method, id, data):
+		'''send a request and wait for its response'''
+		timeout = self._timeout(method)
+		deadline = None if timeout is None else _clock() + timeout
+		self._send(data, timeout)
+		try:
+			r = self._recv(deadline)
+		except socket.timeout:
+			self._abandoned.add(id)
+			raise sl4aTimeout('%s: no response in %s seconds' % (method, timeout))
+		if r['id'] != id:
+			raise sl4aError('%s: unexpected response id: %s' % (method, r['id']))
+		return r
+
+	def _rpc(self, method, *args):
+		id, data = self._request(method, args)
+		if not self.monitor.enabled:
+			r = self._exchange(method, id, data)
+		else:
+			start = _clock()
+			try:
+				r = self._exchange(method, id, data)
+			except:
+				self.monitor.record(method, _clock() - start, len(data), 0, True)
+				raise
+			self.monitor.record(method, _clock() - start, len(data), self.transport.received, r['error'])
+		return Result(id = r['id'], result = r['result'], error = r['error'])
+
+	def _queue(self, method, args):
+		'''queue a call in current batch'''
+		id, data = self._request(method, args)
+		future = sl4aFuture(id, method)
+		self._batch.append((future, data))
+		return future
+
+	def _flush(self, pending):
+		'''send all PENDING requests at once, then match responses by id
+		the batch has the longest deadline of its calls'''
+		if not pending: return
+		timeouts = [self._timeout(future.method) for future, data in pending]
+		timeout = None if None in timeouts else max(timeouts)
+		monitor = self.monitor.enabled and self.monitor
+		start = _clock()
+		deadline = None if timeout is None else start + timeout
+		self._send(b''.join([data for future, data in pending]), timeout)
+		futures = dict([(future.id, (future, data)) for future, data in pending])
+		error = None
+		while futures:
+			try:
+				r = self._recv(deadline)
+			except socket.timeout:
+				for future, data in futures.values():
+					self._abandoned.add(future.id)
+					future._set(None, 'timeout')
+				raise sl4aTimeout('batch: no response in %s seconds' % timeout)
+			future, data = futures.pop(r['id'], (None, None))
+			if future is None:
+				raise sl4aError('unexpected response id: %s' % r['id'])
+			future._set(r['result'], r['error'])
+			if monitor:
+				monitor.record(future.method, _clock() - start, len(data), self.transport.received, r['error'])
+			if r['error'] and error is None:
+				error = '%s: %s' % (future.method, r['error'])
+		if error:
+			raise sl4aError(error)
+
+	@contextmanager
+	def deadline(self, seconds):
+		'''calls in the with block must be answered in SECONDS, or sl4aTimeout is raised
+		it overrides per method deadlines, None waits forever'''
+		old, self._deadline = self._deadline, (seconds,)
+		try:
+			yield self
+		finally:
+			self._deadline = old
+
+	@contextmanager
+	def batch(self):
+		'''pipeline rpc calls, all calls in the with block are sent in one write
+
+		with droid.batch():
+			droid.dialogCreateAlert(title)
+			r = droid.dialogShow()
+
+		calls return sl4aFuture inside the block, its result is available
+		after the block exits. nested batch joins the outer one.
+		sl4aError is raised on exit if any of the calls failed.
+		if the block raises, nothing is sent and the calls fail'''
+		if self._batch is not None:
+			yield self
+			return
+		self._batch = []
+		try:
+			yield self
+		except:
+			pending, self._batch = self._batch, None
+			for future, data in pending:
+				future._set(None, 'batch aborted')
+			raise
+		pending, self._batch = self._batch, None
+		self._flush(pending)
+
+
+class sl4aMux(sl4a):
+	'''sl4a connection shared by threads
+
+	a reader thread owns the receive side and routes every response to
+	the thread waiting for its id, so threads pipeline their calls on one
+	socket instead of taking turns. the server still answers them in order,
+	use sl4aPool to run long calls (e.g. dialogGetResponse) beside others.
+	batch() and deadline() apply to the calling thread only'''
+	def __init__(self, addr = None, codec = None, prewarm = False):
+		self._local = threading.local()
+		# guards ids, sending and routes
+		self._lock = threading.RLock()
+		# id -> inbox of the waiting thread
+		self._routes = {}
+		self._reader = None
+		sl4a.__init__(self, addr, codec, prewarm)
+
+	_batch = property(lambda self: getattr(self._local, 'batch', None),
+		lambda self, value: setattr(self._local, 'batch', value))
+	_deadline = property(lambda self: getattr(self._local, 'deadline', None),
+		lambda self, value: setattr(self._local, 'deadline', value))
+
+	def _inbox(self):
+		inbox = getattr(self._local, 'inbox', None)
+		if inbox is None:
+			inbox = self._local.inbox = (deque(), threading.Condition(threading.Lock()))
+		return inbox
+
+	def _open(self):
+		sl4a._open(self)
+		self._reader = threading.Thread(target = self._read, args = (self.transport,))
+		self._reader.daemon = True
+		self._reader.start()
+
+	def _read(self, t):
+		'''reader thread, deliver responses until the connection breaks'''
+		try:
+			while True:
+				r = t.recv()
+				with self._lock:
+					inbox = self._routes.pop(r['id'], None)
+				if inbox is None:
+					self._abandoned.discard(r['id'])
+					continue
+				responses, cond = inbox
+				with cond:
+					responses.append(r)
+					cond.notify()
+		except Exception as e:
+			error = e if isinstance(e, (socket.error, IOError)) else IOError(str(e))
+		with self._lock:
+			if self.transport is t:
+				self.transport = None
+			routes, self._routes = self._routes, {}
+		# wake up every waiting thread
+		for responses, cond in set(routes.values()):
+			with cond:
+				responses.append(error)
+				cond.notify()
+
+	def _request(self, method, args):
+		with self._lock:
+			id, data = sl4a._request(self, method, args)
+			self._routes[id] = self._inbox()
+		return id, data
+
+	def _send(self, data, timeout = None):
+		# the socket timeout is shared with the reader, which waits forever
+		with self._lock:
+			self.transport.send(data)
+
+	def _recv(self, deadline = None):
+		'''next response routed to current thread'''
+		responses, cond = self._inbox()
+		with cond:
+			while True:
+				while responses:
+					r = responses.popleft()
+					if isinstance(r, Exception):
+						raise r
+					if r['id'] in self._abandoned:
+						self._abandoned.discard(r['id'])
+						continue
+					return r
+				if deadline is None:
+					cond.wait()
+				else:
+					timeout = deadline - _clock()
+					if timeout <= 0:
+						raise socket.timeout('timed out')
+					cond.wait(timeout)
+
+
+class sl4aEvents(object):
+	'''device events of a sl4a server, in a local queue
+
+	the events are pushed through an event dispatcher socket and received
+	by a background thread, so waiting for an event takes no rpc call and
+	never waits behind ui calls. when recording or replaying a session,
+	events are read by eventWait rpc calls instead, so they are in the log
+	DROID - sl4a or sl4aProxy to start the dispatcher with'''
+	# max number of events SL4A keeps in its buffer
+	BUFFERED = 1024
+	def __init__(self, droid):
+		self.droid = droid
+		self._events = deque()
+		self._cond = threading.Condition()
+		self._reader = None
+		# time of the latest event received from the dispatcher
+		self._last = None
+
+	def start(self):
+		'''start the event dispatcher and its reader thread'''
+		with self._cond:
+			if self._reader is not None: return self
+			if transport._recorder is not None or transport._replayer is not None:
+				return self
+			port = self.droid.startEventDispatcher(0)
+			if isinstance(self.droid, sl4a):
+				host, codec = self.droid.addr[0], self.droid.codec
+			else:
+				host, codec = HOST, None
+			t = transport.SocketTransport(socket.create_connection((host, port)), codec)
+			self._reader = threading.Thread(target = self._read, args = (t,))
+			self._reader.daemon = True
+			self._reader.start()
+		# events queued before the dispatcher connected are only in the server buffer,
+		# drained once it's connected so none is lost in between. they go before the
+		# ones received since, and those received by both ways are kept once.
+		# SL4A buffers dispatched events too, those older than the latest one
+		# received are delivered already, when the reader is restarted
+		buffered = self.droid.eventPoll(self.BUFFERED) or []
+		with self._cond:
+			received = list(self._events)
+			last = self._last
+			buffered = [e for e in buffered if e not in received
+				and (last is None or e.get('time') is None or e['time'] > last)]
+			self._events.extendleft(reversed(buffered))
+			times = [e['time'] for e in buffered if e.get('time') is not None]
+			if times: self._last = max(times + [last or 0])
+			if self._events: self._cond.notify_all()
+		return self
+
+	def stop(self):
+		'''stop the event dispatcher, events are queued on the server again'''
+		with self._cond:
+			if self._reader is None: return
+			self._reader = None
+		self.droid.stopEventDispatcher()
+
+	def _read(self, t):
+		try:
+			while True:
+				event = t.recv()
+				with self._cond:
+					self._events.append(event)
+					if event.get('time') is not None: self._last = event['time']
+					self._cond.notify_all()
+		except Exception:
+			pass
+		t.close()
+		with self._cond:
+			# dispatcher stopped or connection lost, restarted by next wait()
+			if self._reader is threading.current_thread():
+				self._reader = None
+			self._cond.notify_all()
+
+	def wait(self, timeout = None):
+		'''remove and return the oldest event, None if no event in TIMEOUT ms
+		same as eventWait()'''
+		self.start()
+		if self._reader is None:
+			return self.droid.eventWait(timeout)
+		deadline = None if timeout is None else _clock() + timeout / 1000.0
+		with self._cond:
+			while not self._events:
+				if self._reader is None:
+					break
+				if deadline is None:
+					self._cond.wait()
+				else:
+					remaining = deadline - _clock()
+					if remaining <= 0: return None
+					self._cond.wait(remaining)
+			if self._events:
+				return self._events.popleft()
+		# reader is gone, restart it and try again
+		return self.wait(None if deadline is None else max(deadline - _clock(), 0) * 1000)
+
+	def waitFor(self, name, timeout = None):
+		'''return the oldest event named NAME, None if none in TIMEOUT ms
+		the event is left in the queue, same as eventWaitFor()'''
+		self.start()
+		if self._reader is None:
+			return self.droid.eventWaitFor(name, timeout)
+		deadline = None if timeout is None else _clock() + timeout / 1000.0
+		with self._cond:
+			while True:
+				for event in self._events:
+					if event['name'] == name:
+						return event
+				if self._reader is None:
+					break
+				if deadline is None:
+					self._cond.wait()
+				else:
+					remaining = deadline - _clock()
+					if remaining <= 0: return None
+					self._cond.wait(remaining)
+		# reader is gone, restart it and try again
+		return self.waitFor(name, None if deadline is None else max(deadline - _clock(), 0) * 1000)
+
+	def poll(self, count = 1):
+		'''remove and return the oldest COUNT events, same as eventPoll()'''
+		self.start()
+		if self._reader is None:
+			return self.droid.eventPoll(count)
+		with self._cond:
+			return [self._events.popleft() for i in range(min(count, len(self._events)))]
+
+	def clear(self):
+		'''drop all queued events, here and on the server'''
+		with self._cond:
+			self._events.clear()
+		self.droid.eventClearBuffer()
+
+
+if hasattr(threading, 'main_thread'):
+	_mainthread = threading.main_thread()
+else:	# python 2
+	_mainthread = [t for t in threading.enumerate() if isinstance(t, threading._MainThread)][0]
+
+
+class _Lease(object):
+	'''a connection checked out by a thread'''
+	def __init__(self, pool, conn):
+		self.pool = pool
+		self.conn = conn
+		self.depth = 0
+
+	def __del__(self):
+		# thread exited with a pinned connection, give it back
+		if self.conn is not None:
+			self.pool._release(self.conn)
+
+
+class sl4aPool(object):
+	'''thread safe pool of sl4a connections
+
+	SIZE     - max number of connections, checkout() blocks when all are in use
+	AFFINITY - which threads keep the connection they got until they exit
+	           (or call release()), so all their calls go to the same session.
+	           'main' for the main thread only, which runs the event loop,
+	           True for every thread, False for none. other threads give it
+	           back after each call, so they never hold one while idle
+	FACTORY  - callable to open a new connection'''
+	def __init__(self, size = 4, affinity = 'main', factory = sl4a):
+		self.size = size
+		self.affinity = affinity
+		self.factory = factory
+		self._idle = []
+		self._count = 0
+		self._cond = threading.Condition()
+		self._local = threading.local()
+
+	def put(self, conn):
+		'''add an opened connection to the pool
+		return False if the pool has SIZE connections already, CONN is not added'''
+		with self._cond:
+			if self._count >= self.size:
+				return False
+			self._count += 1
+			self._idle.append(conn)
+			self._cond.notify()
+		return True
+
+	def prewarm(self):
+		'''open a connection in background, for the next thread to check out one
+		does nothing if one is idle already, or the pool is full'''
+		with self._cond:
+			if self._idle or self._count >= self.size:
+				return
+			self._count += 1
+		try:
+			conn = self.factory(prewarm = True)
+		except:
+			with self._cond:
+				self._count -= 1
+				self._cond.notify()
+			raise
+		with self._cond:
+			self._idle.append(conn)
+			self._cond.notify()
+
+	def checkout(self, timeout = None):
+		'''get a connection for current thread
+		raise sl4aError if none is free within TIMEOUT seconds'''
+		lease = getattr(self._local, 'lease', None)
+		if lease is None:
+			lease = _Lease(self, self._acquire(timeout))
+			self._local.lease = lease
+		lease.depth += 1
+		return lease.conn
+
+	def checkin(self, conn):
+		'''return a connection got from checkout()'''
+		lease = getattr(self._local, 'lease', None)
+		if lease is None or lease.conn is not conn:
+			raise sl4aError('connection not checked out by this thread')
+		lease.depth -= 1
+		if lease.depth == 0 and not self._pinned():
+			self.release()
+
+	def _pinned(self):
+		'''if current thread keeps its connection'''
+		if self.affinity == 'main':
+			return threading.current_thread() is _mainthread
+		return self.affinity
+
+	def release(self):
+		'''give back the connection pinned to current thread'''
+		lease = getattr(self._local, 'lease', None)
+		if lease is None: return
+		if lease.depth > 0:
+			raise sl4aError('connection is still in use')
+		self._local.lease = None
+		conn, lease.conn = lease.conn, None
+		self._release(conn)
+
+	def discard(self):
+		'''drop the connection of current thread, e.g. after a socket error'''
+		lease = getattr(self._local, 'lease', None)
+		if lease is None: return
+		self._local.lease = None
+		lease.conn = None
+		with self._cond:
+			self._count -= 1
+			self._cond.notify()
+
+	@contextmanager
+	def connection(self, timeout = None):
+		'''with pool.connection() as droid: ...'''
+		conn = self.checkout(timeout)
+		try:
+			yield conn
+		except (socket.error, IOError):
+			# the stream is broken, never reuse it
+			self.discard()
+			raise
+		except:
+			self.checkin(conn)
+			raise
+		self.checkin(conn)
+
+	def call(self, method, args):
+		'''do one rpc call on a pooled connection
+		same as connection(), without the context manager cost'''
+		conn = self.checkout()
+		try:
+			r = conn._call(method, args)
+		except (socket.error, IOError):
+			self.discard()
+			raise
+		except:
+			self.checkin(conn)
+			raise
+		self.checkin(conn)
+		return r
+
+	def _acquire(self, timeout):
+		with self._cond:
+			while not self._idle and self._count >= self.size:
+				if not self._cond.wait(timeout) and timeout is not None:
+					raise sl4aError('no free sl4a connection in %s seconds' % timeout)
+			if self._idle:
+				return self._idle.pop()
+			self._count += 1
+		try:
+			return self.factory()
+		except:
+			with self._cond:
+				self._count -= 1
+				self._cond.notify()
+			raise
+
+	def _release(self, conn):
+		with self._cond:
+			self._idle.append(conn)
+			self._cond.notify()
+
+
+class sl4aProxy(sl4aRpc):
+	'''sl4a compatible object, every rpc call runs on a connection from POOL'''
+	def __init__(self, pool):
+		self._pool = pool
+		self._events = None
+
 	def __getattr__(self, name):
 		def rpc_call(*args):
-			r = self._rpc(name, *args)
-			if r.error:
-				raise sl4aError(r.error)
-			return r.result
+			return self._call(name, args)
 		return rpc_call
 
+	def _call(self, method, args):
+		return self._pool.call(method, args)
+
+	@property
+	def events(self):
+		'''sl4aEvents listener shared by all connections of the pool'''
+		if self._events is None:
+			self._events = sl4aEvents(self)
+		return self._events
+
+	@contextmanager
+	def batch(self):
+		'''see sl4a.batch(), the connection is kept for the whole block'''
+		with self._pool.connection() as droid:
+			with droid.batch():
+				yield self
+
+	@contextmanager
+	def deadline(self, seconds):
+		'''see sl4a.deadline(), the connection is kept for the whole block'''
+		with self._pool.connection() as droid:
+			with droid.deadline(seconds):
+				yield self
+
+	def connect(self):
+		'''open the connection of current thread now, instead of on first rpc call'''
+		with self._pool.connection() as droid:
+			droid.connect()
+
+	def prewarm(self):
+		'''open a connection in background, for the next thread to check out one'''
+		self._pool.prewarm()
+
+# connections shared by DroidUi, DroidDialog and DroidFacade
+# opened lazily, nothing is connected at import time
+pool = sl4aPool()
+
 # used internally by DroidUi
-_a = sl4a()
+_a = sl4aProxy(pool)
+
+def connect():
+	'''connect now, so the first rpc call of current thread won't wait'''
+	_a.connect()
 
+def prewarm():
+	'''start connecting in background while the script builds its layout'''
+	_a.prewarm()
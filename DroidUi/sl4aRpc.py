@@ -0,0 +1,745 @@
+#
+# sl4aRpc.py
+# one stub method per known SL4A rpc
+#
+# generated by tools/sl4aRpc.py from tools/sl4aRpc.txt, DO NOT EDIT
+
+
+class sl4aRpc(object):
+	'''rpc stubs with arity and defaults baked in
+	subclass must implement _call(method, args)'''
+
+	# ActivityResultFacade
+
+	def setResultBoolean(self, resultCode, resultValue):
+		return self._call('setResultBoolean', (resultCode, resultValue))
+
+	def setResultString(self, resultCode, resultValue):
+		return self._call('setResultString', (resultCode, resultValue))
+
+	def setResultInteger(self, resultCode, resultValue):
+		return self._call('setResultInteger', (resultCode, resultValue))
+
+	# AndroidFacade
+
+	def environment(self):
+		return self._call('environment', ())
+
+	def getClipboard(self):
+		return self._call('getClipboard', ())
+
+	def setClipboard(self, text):
+		return self._call('setClipboard', (text,))
+
+	def getConstants(self, classname):
+		return self._call('getConstants', (classname,))
+
+	def getIntent(self):
+		return self._call('getIntent', ())
+
+	def getPackageVersion(self, packageName):
+		return self._call('getPackageVersion', (packageName,))
+
+	def getPackageVersionCode(self, packageName):
+		return self._call('getPackageVersionCode', (packageName,))
+
+	def log(self, message):
+		return self._call('log', (message,))
+
+	def makeIntent(self, action, uri = None, type = None, extras = None, categories = None, packagename = None, classname = None, flags = None):
+		return self._call('makeIntent', (action, uri, type, extras, categories, packagename, classname, flags))
+
+	def makeToast(self, message):
+		return self._call('makeToast', (message,))
+
+	def notify(self, title, message):
+		return self._call('notify', (title, message))
+
+	def requiredVersion(self, requiredVersion):
+		return self._call('requiredVersion', (requiredVersion,))
+
+	def sendBroadcast(self, action, uri = None, type = None, extras = None, packagename = None, classname = None):
+		return self._call('sendBroadcast', (action, uri, type, extras, packagename, classname))
+
+	def sendBroadcastIntent(self, intent):
+		return self._call('sendBroadcastIntent', (intent,))
+
+	def sendEmail(self, to, subject, body, attachmentUri = None):
+		return self._call('sendEmail', (to, subject, body, attachmentUri))
+
+	def startActivity(self, action, uri = None, type = None, extras = None, wait = None, packagename = None, classname = None):
+		return self._call('startActivity', (action, uri, type, extras, wait, packagename, classname))
+
+	def startActivityForResult(self, action, uri = None, type = None, extras = None, packagename = None, classname = None):
+		return self._call('startActivityForResult', (action, uri, type, extras, packagename, classname))
+
+	def startActivityForResultIntent(self, intent):
+		return self._call('startActivityForResultIntent', (intent,))
+
+	def startActivityIntent(self, intent, wait = None):
+		return self._call('startActivityIntent', (intent, wait))
+
+	def vibrate(self, duration = 300):
+		return self._call('vibrate', (duration,))
+
+	# ApplicationManagerFacade
+
+	def forceStopPackage(self, packageName):
+		return self._call('forceStopPackage', (packageName,))
+
+	def getLaunchableApplications(self):
+		return self._call('getLaunchableApplications', ())
+
+	def getRunningPackages(self):
+		return self._call('getRunningPackages', ())
+
+	def launch(self, className):
+		return self._call('launch', (className,))
+
+	# BatteryManagerFacade
+
+	def batteryCheckPresent(self):
+		return self._call('batteryCheckPresent', ())
+
+	def batteryGetHealth(self):
+		return self._call('batteryGetHealth', ())
+
+	def batteryGetLevel(self):
+		return self._call('batteryGetLevel', ())
+
+	def batteryGetPlugType(self):
+		return self._call('batteryGetPlugType', ())
+
+	def batteryGetStatus(self):
+		return self._call('batteryGetStatus', ())
+
+	def batteryGetTechnology(self):
+		return self._call('batteryGetTechnology', ())
+
+	def batteryGetTemperature(self):
+		return self._call('batteryGetTemperature', ())
+
+	def batteryGetVoltage(self):
+		return self._call('batteryGetVoltage', ())
+
+	def batteryStartMonitoring(self):
+		return self._call('batteryStartMonitoring', ())
+
+	def batteryStopMonitoring(self):
+		return self._call('batteryStopMonitoring', ())
+
+	def readBatteryData(self):
+		return self._call('readBatteryData', ())
+
+	# BluetoothFacade
+
+	def bluetoothAccept(self, uuid = '457807c0-4897-11df-9879-0800200c9a66', timeout = 0):
+		return self._call('bluetoothAccept', (uuid, timeout))
+
+	def bluetoothActiveConnections(self):
+		return self._call('bluetoothActiveConnections', ())
+
+	def bluetoothConnect(self, uuid = '457807c0-4897-11df-9879-0800200c9a66', address = None):
+		return self._call('bluetoothConnect', (uuid, address))
+
+	def bluetoothDiscoveryCancel(self):
+		return self._call('bluetoothDiscoveryCancel', ())
+
+	def bluetoothDiscoveryStart(self):
+		return self._call('bluetoothDiscoveryStart', ())
+
+	def bluetoothGetConnectedDeviceName(self, connID = None):
+		return self._call('bluetoothGetConnectedDeviceName', (connID,))
+
+	def bluetoothGetLocalAddress(self):
+		return self._call('bluetoothGetLocalAddress', ())
+
+	def bluetoothGetLocalName(self):
+		return self._call('bluetoothGetLocalName', ())
+
+	def bluetoothGetRemoteDeviceName(self, address):
+		return self._call('bluetoothGetRemoteDeviceName', (address,))
+
+	def bluetoothGetScanMode(self):
+		return self._call('bluetoothGetScanMode', ())
+
+	def bluetoothIsDiscovering(self):
+		return self._call('bluetoothIsDiscovering', ())
+
+	def bluetoothMakeDiscoverable(self, duration = 300):
+		return self._call('bluetoothMakeDiscoverable', (duration,))
+
+	def bluetoothRead(self, bufferSize = 4096, connID = ''):
+		return self._call('bluetoothRead', (bufferSize, connID))
+
+	def bluetoothReadBinary(self, bufferSize = 4096, connID = ''):
+		return self._call('bluetoothReadBinary', (bufferSize, connID))
+
+	def bluetoothReadLine(self, connID = None):
+		return self._call('bluetoothReadLine', (connID,))
+
+	def bluetoothReadReady(self, connID = None):
+		return self._call('bluetoothReadReady', (connID,))
+
+	def bluetoothSetLocalName(self, name):
+		return self._call('bluetoothSetLocalName', (name,))
+
+	def bluetoothStop(self, connID = None):
+		return self._call('bluetoothStop', (connID,))
+
+	def bluetoothWrite(self, ascii, connID = ''):
+		return self._call('bluetoothWrite', (ascii, connID))
+
+	def bluetoothWriteBinary(self, base64, connID = ''):
+		return self._call('bluetoothWriteBinary', (base64, connID))
+
+	def checkBluetoothState(self):
+		return self._call('checkBluetoothState', ())
+
+	def toggleBluetoothState(self, enabled = None, prompt = True):
+		return self._call('toggleBluetoothState', (enabled, prompt))
+
+	# CameraFacade
+
+	def cameraCapturePicture(self, targetPath, useAutoFocus = True):
+		return self._call('cameraCapturePicture', (targetPath, useAutoFocus))
+
+	def cameraInteractiveCapturePicture(self, targetPath):
+		return self._call('cameraInteractiveCapturePicture', (targetPath,))
+
+	# CommonIntentsFacade
+
+	def pick(self, uri):
+		return self._call('pick', (uri,))
+
+	def scanBarcode(self):
+		return self._call('scanBarcode', ())
+
+	def search(self, query):
+		return self._call('search', (query,))
+
+	def view(self, uri, type = None, extras = None):
+		return self._call('view', (uri, type, extras))
+
+	def viewContacts(self):
+		return self._call('viewContacts', ())
+
+	def viewHtml(self, path):
+		return self._call('viewHtml', (path,))
+
+	def viewMap(self, query):
+		return self._call('viewMap', (query,))
+
+	# ContactsFacade
+
+	def contactsGet(self, attributes = None):
+		return self._call('contactsGet', (attributes,))
+
+	def contactsGetAttributes(self):
+		return self._call('contactsGetAttributes', ())
+
+	def contactsGetById(self, id, attributes = None):
+		return self._call('contactsGetById', (id, attributes))
+
+	def contactsGetCount(self):
+		return self._call('contactsGetCount', ())
+
+	def contactsGetIds(self):
+		return self._call('contactsGetIds', ())
+
+	def pickContact(self):
+		return self._call('pickContact', ())
+
+	def pickPhone(self):
+		return self._call('pickPhone', ())
+
+	def queryAttributes(self, uri):
+		return self._call('queryAttributes', (uri,))
+
+	def queryContent(self, uri, attributes = None, selection = None, selectionArgs = None, order = None):
+		return self._call('queryContent', (uri, attributes, selection, selectionArgs, order))
+
+	# EventFacade
+
+	def eventClearBuffer(self):
+		return self._call('eventClearBuffer', ())
+
+	def eventGetBrodcastCategories(self):
+		return self._call('eventGetBrodcastCategories', ())
+
+	def eventPoll(self, number_of_events = 1):
+		return self._call('eventPoll', (number_of_events,))
+
+	def eventPost(self, name, data, enqueue = None):
+		return self._call('eventPost', (name, data, enqueue))
+
+	def eventRegisterForBroadcast(self, category, enqueue = True):
+		return self._call('eventRegisterForBroadcast', (category, enqueue))
+
+	def eventUnregisterForBroadcast(self, category):
+		return self._call('eventUnregisterForBroadcast', (category,))
+
+	def eventWait(self, timeout = None):
+		return self._call('eventWait', (timeout,))
+
+	def eventWaitFor(self, eventName, timeout = None):
+		return self._call('eventWaitFor', (eventName, timeout))
+
+	def startEventDispatcher(self, port = 0):
+		return self._call('startEventDispatcher', (port,))
+
+	def stopEventDispatcher(self):
+		return self._call('stopEventDispatcher', ())
+
+	# LocationFacade
+
+	def geocode(self, latitude, longitude, maxResults = 1):
+		return self._call('geocode', (latitude, longitude, maxResults))
+
+	def getLastKnownLocation(self):
+		return self._call('getLastKnownLocation', ())
+
+	def locationProviderEnabled(self, provider):
+		return self._call('locationProviderEnabled', (provider,))
+
+	def locationProviders(self):
+		return self._call('locationProviders', ())
+
+	def readLocation(self):
+		return self._call('readLocation', ())
+
+	def startLocating(self, minDistance = 60000, minUpdateDistance = 30):
+		return self._call('startLocating', (minDistance, minUpdateDistance))
+
+	def stopLocating(self):
+		return self._call('stopLocating', ())
+
+	# MediaPlayerFacade
+
+	def mediaIsPlaying(self, tag = 'default'):
+		return self._call('mediaIsPlaying', (tag,))
+
+	def mediaPlay(self, url, tag = 'default', play = True):
+		return self._call('mediaPlay', (url, tag, play))
+
+	def mediaPlayClose(self, tag = 'default'):
+		return self._call('mediaPlayClose', (tag,))
+
+	def mediaPlayInfo(self, tag = 'default'):
+		return self._call('mediaPlayInfo', (tag,))
+
+	def mediaPlayList(self):
+		return self._call('mediaPlayList', ())
+
+	def mediaPlayPause(self, tag = 'default'):
+		return self._call('mediaPlayPause', (tag,))
+
+	def mediaPlaySeek(self, msec, tag = 'default'):
+		return self._call('mediaPlaySeek', (msec, tag))
+
+	def mediaPlaySetLooping(self, enabled = True, tag = 'default'):
+		return self._call('mediaPlaySetLooping', (enabled, tag))
+
+	def mediaPlayStart(self, tag = 'default'):
+		return self._call('mediaPlayStart', (tag,))
+
+	# MediaRecorderFacade
+
+	def recorderCaptureVideo(self, targetPath, duration = None, recordAudio = True):
+		return self._call('recorderCaptureVideo', (targetPath, duration, recordAudio))
+
+	def recorderStartMicrophone(self, targetPath):
+		return self._call('recorderStartMicrophone', (targetPath,))
+
+	def recorderStartVideo(self, targetPath, duration = 0, videoSize = 1):
+		return self._call('recorderStartVideo', (targetPath, duration, videoSize))
+
+	def recorderStop(self):
+		return self._call('recorderStop', ())
+
+	def startInteractiveVideoRecording(self, path):
+		return self._call('startInteractiveVideoRecording', (path,))
+
+	# PhoneFacade
+
+	def checkNetworkRoaming(self):
+		return self._call('checkNetworkRoaming', ())
+
+	def getCellLocation(self):
+		return self._call('getCellLocation', ())
+
+	def getDeviceId(self):
+		return self._call('getDeviceId', ())
+
+	def getDeviceSoftwareVersion(self):
+		return self._call('getDeviceSoftwareVersion', ())
+
+	def getLine1Number(self):
+		return self._call('getLine1Number', ())
+
+	def getNeighboringCellInfo(self):
+		return self._call('getNeighboringCellInfo', ())
+
+	def getNetworkOperator(self):
+		return self._call('getNetworkOperator', ())
+
+	def getNetworkOperatorName(self):
+		return self._call('getNetworkOperatorName', ())
+
+	def getNetworkType(self):
+		return self._call('getNetworkType', ())
+
+	def getPhoneType(self):
+		return self._call('getPhoneType', ())
+
+	def getSimCountryIso(self):
+		return self._call('getSimCountryIso', ())
+
+	def getSimOperator(self):
+		return self._call('getSimOperator', ())
+
+	def getSimOperatorName(self):
+		return self._call('getSimOperatorName', ())
+
+	def getSimSerialNumber(self):
+		return self._call('getSimSerialNumber', ())
+
+	def getSimState(self):
+		return self._call('getSimState', ())
+
+	def getSubscriberId(self):
+		return self._call('getSubscriberId', ())
+
+	def getVoiceMailAlphaTag(self):
+		return self._call('getVoiceMailAlphaTag', ())
+
+	def getVoiceMailNumber(self):
+		return self._call('getVoiceMailNumber', ())
+
+	def phoneCall(self, uri):
+		return self._call('phoneCall', (uri,))
+
+	def phoneCallNumber(self, phone_number):
+		return self._call('phoneCallNumber', (phone_number,))
+
+	def phoneDial(self, uri):
+		return self._call('phoneDial', (uri,))
+
+	def phoneDialNumber(self, phone_number):
+		return self._call('phoneDialNumber', (phone_number,))
+
+	def readPhoneState(self):
+		return self._call('readPhoneState', ())
+
+	def startTrackingPhoneState(self):
+		return self._call('startTrackingPhoneState', ())
+
+	def stopTrackingPhoneState(self):
+		return self._call('stopTrackingPhoneState', ())
+
+	# PreferencesFacade
+
+	def prefGetAll(self, filename = None):
+		return self._call('prefGetAll', (filename,))
+
+	def prefGetValue(self, key, filename = None):
+		return self._call('prefGetValue', (key, filename))
+
+	def prefPutValue(self, key, value, filename = None):
+		return self._call('prefPutValue', (key, value, filename))
+
+	# SensorManagerFacade
+
+	def readSensors(self):
+		return self._call('readSensors', ())
+
+	def sensorsGetAccuracy(self):
+		return self._call('sensorsGetAccuracy', ())
+
+	def sensorsGetLight(self):
+		return self._call('sensorsGetLight', ())
+
+	def sensorsReadAccelerometer(self):
+		return self._call('sensorsReadAccelerometer', ())
+
+	def sensorsReadMagnetometer(self):
+		return self._call('sensorsReadMagnetometer', ())
+
+	def sensorsReadOrientation(self):
+		return self._call('sensorsReadOrientation', ())
+
+	def startSensingThreshold(self, sensorNumber, axis, threshold):
+		return self._call('startSensingThreshold', (sensorNumber, axis, threshold))
+
+	def startSensingTimed(self, sensorNumber, delayTime):
+		return self._call('startSensingTimed', (sensorNumber, delayTime))
+
+	def stopSensing(self):
+		return self._call('stopSensing', ())
+
+	# SettingsFacade
+
+	def checkAirplaneMode(self):
+		return self._call('checkAirplaneMode', ())
+
+	def checkRingerSilentMode(self):
+		return self._call('checkRingerSilentMode', ())
+
+	def checkScreenOn(self):
+		return self._call('checkScreenOn', ())
+
+	def getMaxMediaVolume(self):
+		return self._call('getMaxMediaVolume', ())
+
+	def getMaxRingerVolume(self):
+		return self._call('getMaxRingerVolume', ())
+
+	def getMediaVolume(self):
+		return self._call('getMediaVolume', ())
+
+	def getRingerVolume(self):
+		return self._call('getRingerVolume', ())
+
+	def getScreenBrightness(self):
+		return self._call('getScreenBrightness', ())
+
+	def getScreenTimeout(self):
+		return self._call('getScreenTimeout', ())
+
+	def getVibrateMode(self, ringer = None):
+		return self._call('getVibrateMode', (ringer,))
+
+	def setMediaVolume(self, volume):
+		return self._call('setMediaVolume', (volume,))
+
+	def setRingerVolume(self, volume):
+		return self._call('setRingerVolume', (volume,))
+
+	def setScreenBrightness(self, value):
+		return self._call('setScreenBrightness', (value,))
+
+	def setScreenTimeout(self, value):
+		return self._call('setScreenTimeout', (value,))
+
+	def toggleAirplaneMode(self, enabled = None):
+		return self._call('toggleAirplaneMode', (enabled,))
+
+	def toggleRingerSilentMode(self, enabled = None):
+		return self._call('toggleRingerSilentMode', (enabled,))
+
+	def toggleVibrateMode(self, enabled = None, ringer = None):
+		return self._call('toggleVibrateMode', (enabled, ringer))
+
+	# SignalStrengthFacade
+
+	def readSignalStrengths(self):
+		return self._call('readSignalStrengths', ())
+
+	def startTrackingSignalStrengths(self):
+		return self._call('startTrackingSignalStrengths', ())
+
+	def stopTrackingSignalStrengths(self):
+		return self._call('stopTrackingSignalStrengths', ())
+
+	# SmsFacade
+
+	def smsDeleteMessage(self, id):
+		return self._call('smsDeleteMessage', (id,))
+
+	def smsGetAttributes(self):
+		return self._call('smsGetAttributes', ())
+
+	def smsGetMessageById(self, id, attributes = None):
+		return self._call('smsGetMessageById', (id, attributes))
+
+	def smsGetMessageCount(self, unreadOnly, folder = 'inbox'):
+		return self._call('smsGetMessageCount', (unreadOnly, folder))
+
+	def smsGetMessageIds(self, unreadOnly, folder = 'inbox'):
+		return self._call('smsGetMessageIds', (unreadOnly, folder))
+
+	def smsGetMessages(self, unreadOnly, folder = 'inbox', attributes = None):
+		return self._call('smsGetMessages', (unreadOnly, folder, attributes))
+
+	def smsMarkMessageRead(self, ids, read):
+		return self._call('smsMarkMessageRead', (ids, read))
+
+	def smsSend(self, destinationAddress, text):
+		return self._call('smsSend', (destinationAddress, text))
+
+	# SpeechRecognitionFacade
+
+	def recognizeSpeech(self, prompt = None, language = None, languageModel = None):
+		return self._call('recognizeSpeech', (prompt, language, languageModel))
+
+	# TextToSpeechFacade
+
+	def ttsIsSpeaking(self):
+		return self._call('ttsIsSpeaking', ())
+
+	def ttsSpeak(self, message):
+		return self._call('ttsSpeak', (message,))
+
+	# ToneGeneratorFacade
+
+	def generateDtmfTones(self, phoneNumber, toneDuration = 100):
+		return self._call('generateDtmfTones', (phoneNumber, toneDuration))
+
+	# UiFacade
+
+	def addContextMenuItem(self, label, event, eventData = None):
+		return self._call('addContextMenuItem', (label, event, eventData))
+
+	def addOptionsMenuItem(self, label, event, eventData = None, iconName = None):
+		return self._call('addOptionsMenuItem', (label, event, eventData, iconName))
+
+	def clearContextMenu(self):
+		return self._call('clearContextMenu', ())
+
+	def clearOptionsMenu(self):
+		return self._call('clearOptionsMenu', ())
+
+	def dialogCreateAlert(self, title = None, message = None):
+		return self._call('dialogCreateAlert', (title, message))
+
+	def dialogCreateDatePicker(self, year = 1970, month = 1, day = 1):
+		return self._call('dialogCreateDatePicker', (year, month, day))
+
+	def dialogCreateHorizontalProgress(self, title = None, message = None, maximum = 100):
+		return self._call('dialogCreateHorizontalProgress', (title, message, maximum))
+
+	def dialogCreateInput(self, title = 'Value', message = 'Please enter value:', defaultText = None, inputType = None):
+		return self._call('dialogCreateInput', (title, message, defaultText, inputType))
+
+	def dialogCreatePassword(self, title = 'Password', message = 'Please enter password:'):
+		return self._call('dialogCreatePassword', (title, message))
+
+	def dialogCreateSeekBar(self, starting = 50, maximum = 100, title = None, message = None):
+		return self._call('dialogCreateSeekBar', (starting, maximum, title, message))
+
+	def dialogCreateSpinnerProgress(self, title = None, message = None, maximum = 100):
+		return self._call('dialogCreateSpinnerProgress', (title, message, maximum))
+
+	def dialogCreateTimePicker(self, hour = 0, minute = 0, is24hour = False):
+		return self._call('dialogCreateTimePicker', (hour, minute, is24hour))
+
+	def dialogDismiss(self):
+		return self._call('dialogDismiss', ())
+
+	def dialogGetInput(self, title = 'Value', message = 'Please enter value:', defaultText = None):
+		return self._call('dialogGetInput', (title, message, defaultText))
+
+	def dialogGetPassword(self, title = 'Password', message = 'Please enter password:'):
+		return self._call('dialogGetPassword', (title, message))
+
+	def dialogGetResponse(self):
+		return self._call('dialogGetResponse', ())
+
+	def dialogGetSelectedItems(self):
+		return self._call('dialogGetSelectedItems', ())
+
+	def dialogSetCurrentProgress(self, current):
+		return self._call('dialogSetCurrentProgress', (current,))
+
+	def dialogSetItems(self, items):
+		return self._call('dialogSetItems', (items,))
+
+	def dialogSetMaxProgress(self, max):
+		return self._call('dialogSetMaxProgress', (max,))
+
+	def dialogSetMultiChoiceItems(self, items, selected = None):
+		return self._call('dialogSetMultiChoiceItems', (items, selected))
+
+	def dialogSetNegativeButtonText(self, text):
+		return self._call('dialogSetNegativeButtonText', (text,))
+
+	def dialogSetNeutralButtonText(self, text):
+		return self._call('dialogSetNeutralButtonText', (text,))
+
+	def dialogSetPositiveButtonText(self, text):
+		return self._call('dialogSetPositiveButtonText', (text,))
+
+	def dialogSetSingleChoiceItems(self, items, selected = 0):
+		return self._call('dialogSetSingleChoiceItems', (items, selected))
+
+	def dialogShow(self):
+		return self._call('dialogShow', ())
+
+	def fullDismiss(self):
+		return self._call('fullDismiss', ())
+
+	def fullKeyOverride(self, keycodes, enable = True):
+		return self._call('fullKeyOverride', (keycodes, enable))
+
+	def fullQuery(self):
+		return self._call('fullQuery', ())
+
+	def fullQueryDetail(self, id):
+		return self._call('fullQueryDetail', (id,))
+
+	def fullSetList(self, id, list):
+		return self._call('fullSetList', (id, list))
+
+	def fullSetProperty(self, id, property, value):
+		return self._call('fullSetProperty', (id, property, value))
+
+	def fullSetTitle(self, title):
+		return self._call('fullSetTitle', (title,))
+
+	def fullShow(self, layout, title = None):
+		return self._call('fullShow', (layout, title))
+
+	def webViewShow(self, url, wait = None):
+		return self._call('webViewShow', (url, wait))
+
+	# WakeLockFacade
+
+	def wakeLockAcquireBright(self):
+		return self._call('wakeLockAcquireBright', ())
+
+	def wakeLockAcquireDim(self):
+		return self._call('wakeLockAcquireDim', ())
+
+	def wakeLockAcquireFull(self):
+		return self._call('wakeLockAcquireFull', ())
+
+	def wakeLockAcquirePartial(self):
+		return self._call('wakeLockAcquirePartial', ())
+
+	def wakeLockRelease(self):
+		return self._call('wakeLockRelease', ())
+
+	# WifiFacade
+
+	def checkWifiState(self):
+		return self._call('checkWifiState', ())
+
+	def toggleWifiState(self, enabled = None):
+		return self._call('toggleWifiState', (enabled,))
+
+	def wifiDisconnect(self):
+		return self._call('wifiDisconnect', ())
+
+	def wifiGetConnectionInfo(self):
+		return self._call('wifiGetConnectionInfo', ())
+
+	def wifiGetScanResults(self):
+		return self._call('wifiGetScanResults', ())
+
+	def wifiLockAcquireFull(self):
+		return self._call('wifiLockAcquireFull', ())
+
+	def wifiLockAcquireScanOnly(self):
+		return self._call('wifiLockAcquireScanOnly', ())
+
+	def wifiLockRelease(self):
+		return self._call('wifiLockRelease', ())
+
+	def wifiReassociate(self):
+		return self._call('wifiReassociate', ())
+
+	def wifiReconnect(self):
+		return self._call('wifiReconnect', ())
+
+	def wifiStartScan(self):
+		return self._call('wifiStartScan', ())
@@ -0,0 +1,356 @@
+#
+# Copyright (C) 2012-2014 Tommy Alex. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+# transport.py
+# json codec and newline framed socket transport for sl4a
+
+
+import os
+import json
+import gzip
+import time
+import socket
+import threading
+from collections import deque
+
+
+def _tobytes(data):
+	return data.tobytes() if isinstance(data, memoryview) else data
+
+
+class Codec(object):
+	'''json codec working on bytes
+	DUMPS(obj) returns bytes, LOADS(data) accepts bytes or memoryview'''
+	def __init__(self, name, dumps, loads):
+		self.name = name
+		self.dumps = dumps
+		self.loads = loads
+
+	def __repr__(self):
+		return '<Codec %s>' % self.name
+
+
+# available codecs, the fastest one is used by default
+codecs = {
+	'json': Codec('json',
+		lambda obj: json.dumps(obj).encode('utf-8'),
+		lambda data: json.loads(_tobytes(data).decode('utf-8'))),
+}
+
+try:
+	import ujson
+	codecs['ujson'] = Codec('ujson',
+		lambda obj: ujson.dumps(obj).encode('utf-8'),
+		lambda data: ujson.loads(_tobytes(data)))
+except ImportError:
+	pass
+
+try:
+	import orjson
+	codecs['orjson'] = Codec('orjson', orjson.dumps, orjson.loads)
+except ImportError:
+	pass
+
+codec = None
+
+def setcodec(name = None):
+	'''set default codec for new transports
+	NAME may be a codec name, a Codec object, or None for the fastest available one'''
+	global codec
+	if name is None:
+		for name in ('orjson', 'ujson', 'json'):
+			if name in codecs: break
+	codec = name if isinstance(name, Codec) else codecs[name]
+	return codec
+
+def getcodec():
+	'''get default codec'''
+	return codec
+
+setcodec()
+
+
+class SocketTransport(object):
+	'''newline framed json messages over a socket
+
+	received data goes into a reusable bytearray through recv_into,
+	lines are located and decoded over a memoryview, no per line copy
+	SOCK    - a connected socket
+	CODEC   - Codec to use, default codec if None
+	BUFSIZE - initial receive buffer size, it grows for longer lines'''
+	def __init__(self, sock, codec = None, bufsize = 65536):
+		self.sock = sock
+		self.codec = codec or getcodec()
+		self._buf = bytearray(bufsize)
+		self._view = memoryview(self._buf)
+		# received but not consumed data is self._buf[self._start:self._end]
+		self._start = 0
+		self._end = 0
+		# size of last received line
+		self.received = 0
+		self._timeout = sock.gettimeout()
+
+	def close(self):
+		self.sock.close()
+
+	def encode(self, obj):
+		'''encode OBJ as a line'''
+		return self.codec.dumps(obj) + b'\n'
+
+	def _settimeout(self, timeout):
+		if timeout != self._timeout:
+			self.sock.settimeout(timeout)
+			self._timeout = timeout
+
+	def send(self, data, timeout = None):
+		'''send encoded lines, raise socket.timeout if not sent in TIMEOUT seconds'''
+		self._settimeout(timeout)
+		self.sock.sendall(data)
+
+	def recv(self, timeout = None):
+		'''receive and decode next line, raise socket.timeout if none in TIMEOUT seconds
+		a partly received line is kept for next recv()'''
+		deadline = None if timeout is None else time.time() + timeout
+		scan = self._start
+		while True:
+			pos = self._buf.find(b'\n', scan, self._end)
+			if pos >= 0: break
+			scan = self._end
+			if self._end == len(self._buf):
+				scan -= self._start
+				self._compact()
+			if deadline is not None:
+				timeout = deadline - time.time()
+				if timeout <= 0:
+					raise socket.timeout('timed out')
+			self._settimeout(timeout)
+			n = self.sock.recv_into(self._view[self._end:])
+			if n == 0:
+				raise IOError('connection closed by server')
+			self._end += n
+		obj = self.codec.loads(self._view[self._start:pos])
+		self.received = pos + 1 - self._start
+		if pos + 1 == self._end:
+			self._start = self._end = 0
+		else:
+			self._start = pos + 1
+		return obj
+
+	def _compact(self):
+		'''make room at the end of buffer'''
+		size = self._end - self._start
+		if self._start == 0:
+			# a line longer than the buffer
+			buf = bytearray(len(self._buf) * 2)
+			buf[:size] = self._buf
+			self._buf = buf
+			self._view = memoryview(buf)
+		else:
+			self._buf[:size] = self._buf[self._start:self._end]
+		self._start = 0
+		self._end = size
+
+
+class RecordTransport(object):
+	'''wrap a transport, log every request and response to a Recorder'''
+	def __init__(self, transport, recorder, conn):
+		self.transport = transport
+		self.codec = transport.codec
+		self.recorder = recorder
+		self.conn = conn
+
+	@property
+	def received(self):
+		return self.transport.received
+
+	def close(self):
+		self.transport.close()
+
+	def encode(self, obj):
+		return self.transport.encode(obj)
+
+	def send(self, data, timeout = None):
+		# logged first, a reader thread may log the response before send() returns
+		for line in data.splitlines():
+			self.recorder.write('>', self.conn, self.codec.loads(line))
+		self.transport.send(data, timeout)
+
+	def recv(self, timeout = None):
+		obj = self.transport.recv(timeout)
+		self.recorder.write('<', self.conn, obj)
+		return obj
+
+
+class Recorder(object):
+	'''log of a sl4a session, shared by all connections
+
+	every line of the log is a json array [kind, conn, time, message],
+	KIND is '>' for request and '<' for response, CONN numbers the connection,
+	TIME is seconds since the recording started.
+	the log is gzip compressed if PATH ends with .gz'''
+	def __init__(self, path):
+		self.file = gzip.open(path, 'wb') if path.endswith('.gz') else open(path, 'wb')
+		self.codec = codecs['json']
+		self._lock = threading.Lock()
+		self._conns = 0
+		self._start = time.time()
+
+	def transport(self, transport):
+		'''wrap TRANSPORT of a new connection'''
+		with self._lock:
+			conn = self._conns
+			self._conns += 1
+		return RecordTransport(transport, self, conn)
+
+	def write(self, kind, conn, message):
+		line = self.codec.dumps([kind, conn, round(time.time() - self._start, 6), message]) + b'\n'
+		with self._lock:
+			self.file.write(line)
+			self.file.flush()
+
+	def close(self):
+		self.file.close()
+
+
+class ReplayTransport(object):
+	'''serve recorded responses instead of talking to a server'''
+	def __init__(self, replayer, codec = None):
+		self.replayer = replayer
+		self.codec = codec or getcodec()
+		self.received = 0
+		# (id, time to deliver, recorded response) of sent requests
+		self._pending = deque()
+		# signalled by send() and close(), recv() may be called first by a reader thread
+		self._cond = threading.Condition()
+		self._closed = False
+
+	def close(self):
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+
+	def encode(self, obj):
+		return self.codec.dumps(obj) + b'\n'
+
+	def send(self, data, timeout = None):
+		now = time.time()
+		with self._cond:
+			for line in data.splitlines():
+				request = self.codec.loads(line)
+				latency, response = self.replayer.next(request['method'])
+				self._pending.append((request['id'], now + latency, response))
+			self._cond.notify_all()
+
+	def recv(self, timeout = None):
+		deadline = None if timeout is None else time.time() + timeout
+		with self._cond:
+			while not self._pending:
+				if self._closed:
+					raise IOError('connection closed')
+				if deadline is None:
+					self._cond.wait()
+				else:
+					if deadline <= time.time():
+						raise socket.timeout('timed out')
+					self._cond.wait(deadline - time.time())
+			id, due, response = self._pending[0]
+		now = time.time()
+		if deadline is not None and due > deadline:
+			# the response comes late, as it did in the recording
+			time.sleep(max(deadline - now, 0))
+			raise socket.timeout('timed out')
+		if due > now:
+			time.sleep(due - now)
+		with self._cond:
+			self._pending.popleft()
+		response = {'id': id, 'result': response['result'], 'error': response['error']}
+		self.received = len(self.codec.dumps(response)) + 1
+		return response
+
+
+class Replayer(object):
+	'''recorded responses of a Recorder log, served to ReplayTransport
+
+	responses are handed out per method name in recorded order,
+	so a deterministic script gets the same answers as the recorded run
+	LATENCY - if True, delay every response by its recorded latency'''
+	def __init__(self, path, latency = True):
+		self.latency = latency
+		self._lock = threading.Lock()
+		self._responses = {}
+		codec = codecs['json']
+		requests = {}
+		replies = []
+		f = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+		for line in f:
+			kind, conn, t, message = codec.loads(line)
+			key = conn, message['id']
+			if kind == '>':
+				requests[key] = message['method'], t
+				replies.append(key)
+			elif key in requests:
+				requests[key] += (t, message)
+		f.close()
+		for key in replies:
+			if len(requests[key]) < 4: continue
+			method, sent, received, message = requests[key]
+			self._responses.setdefault(method, deque()).append((received - sent, message))
+
+	def transport(self, codec = None):
+		'''transport of a new connection'''
+		return ReplayTransport(self, codec)
+
+	def next(self, method):
+		'''latency and response of next call to METHOD'''
+		with self._lock:
+			recorded = self._responses.get(method)
+			if recorded:
+				latency, response = recorded.popleft()
+				return (latency if self.latency else 0), response
+		return 0, {'result': None, 'error': 'replay: no recorded response for %s' % method}
+
+
+_recorder = None
+_replayer = None
+
+def record(path):
+	'''record connections opened from now on to PATH'''
+	global _recorder
+	_recorder = Recorder(path)
+	return _recorder
+
+def replay(path, latency = True):
+	'''serve connections opened from now on from recording at PATH'''
+	global _replayer
+	_replayer = Replayer(path, latency)
+	return _replayer
+
+def connect(addr, codec = None):
+	'''open a transport to ADDR, recorded or replayed if configured to'''
+	if _replayer is not None:
+		return _replayer.transport(codec)
+	transport = SocketTransport(socket.create_connection(addr), codec)
+	if _recorder is not None:
+		transport = _recorder.transport(transport)
+	return transport
+
+# set from environment, so existing scripts can be recorded or replayed unchanged
+# DROIDUI_RECORD=session.log.gz python script.py
+# DROIDUI_REPLAY=session.log.gz DROIDUI_REPLAY_LATENCY=0 python script.py
+if os.environ.get('DROIDUI_REPLAY'):
+	replay(os.environ['DROIDUI_REPLAY'], os.environ.get('DROIDUI_REPLAY_LATENCY', '1') != '0')
+elif os.environ.get('DROIDUI_RECORD'):
+	record(os.environ['DROIDUI_RECORD'])
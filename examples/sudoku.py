@@ -84,8 +84,7 @@ class Game:
 	def _hint(self, x, y):
 		l = len(self.tile(x, y))
 		v = l < 3 and self.hint_color[l] or self.puzzle_back
-		if v != self.array[x][y].get('background'):
-			self.array[x][y].configure(background = v)
+		self.array[x][y].configure(background = v)
 	def hint(self, x = None, y = None):
 		if x and y:
 			for i in range(self.size):
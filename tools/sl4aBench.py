@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# sl4aBench.py
+# microbenchmark of sl4a rpc dispatch overhead
+#
+# Copyright (C) 2012-2014 Tommy Alex. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+# the server round trip is replaced by a constant result,
+# so only the python side cost of a call is measured
+
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from DroidUi.sl4a import sl4a, sl4aProxy, sl4aPool, Result
+
+
+NULL = Result(id = 0, result = None, error = None)
+
+
+class NullDroid(sl4a):
+	'''sl4a without server'''
+	def __init__(self):
+		self._batch = None
+		self.id = 0
+
+	def _rpc(self, method, *args):
+		return NULL
+
+
+def bench(name, stmt, number = 200000):
+	t = min(timeit.repeat(stmt, number = number, repeat = 3))
+	print('%-24s %8.0f ns/call' % (name, t / number * 1e9))
+
+
+def main():
+	droid = NullDroid()
+	pool = sl4aPool(factory = NullDroid)
+	proxy = sl4aProxy(pool)
+	dynamic = sl4a.__getattr__
+	bench('dynamic', lambda: dynamic(droid, 'fullSetProperty')('id', 'text', 'hello'))
+	bench('stub', lambda: droid.fullSetProperty('id', 'text', 'hello'))
+	bench('proxy dynamic', lambda: sl4aProxy.__getattr__(proxy, 'fullSetProperty')('id', 'text', 'hello'))
+	bench('proxy stub', lambda: proxy.fullSetProperty('id', 'text', 'hello'))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# sl4aRpc.py
+# generate DroidUi/sl4aRpc.py from sl4aRpc.txt
+#
+# Copyright (C) 2012-2014 Tommy Alex. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+
+import os
+import ast
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+HEADER = '''#
+# sl4aRpc.py
+# one stub method per known SL4A rpc
+#
+# generated by tools/sl4aRpc.py from tools/sl4aRpc.txt, DO NOT EDIT
+
+
+class sl4aRpc(object):
+	\'\'\'rpc stubs with arity and defaults baked in
+	subclass must implement _call(method, args)\'\'\'
+'''
+
+
+def argnames(signature):
+	'''parameter names of a python style SIGNATURE'''
+	func = ast.parse('def f(%s): pass' % signature).body[0]
+	return [getattr(a, 'arg', None) or a.id for a in func.args.args]
+
+
+def sl4aRpc():
+	out = open(os.path.join(HERE, '..', 'DroidUi', 'sl4aRpc.py'), 'w')
+	out.write(HEADER)
+	for line in open(os.path.join(HERE, 'sl4aRpc.txt')):
+		line = line.strip()
+		if not line:
+			continue
+		if line.startswith('#'):
+			# keep facade names as section comments
+			if line.endswith('Facade'):
+				out.write('\n\t%s\n' % line)
+			continue
+		name, signature = line.split('(', 1)
+		signature = signature[:-1]
+		args = argnames(signature)
+		params = ['self'] + [p.replace('=', ' = ', 1) for p in signature.split(', ') if p]
+		if len(args) == 1:
+			args = '(%s,)' % args[0]
+		else:
+			args = '(%s)' % ', '.join(args)
+		out.write('\n')
+		out.write('\tdef %s(%s):\n' % (name, ', '.join(params)))
+		out.write("\t\treturn self._call('%s', %s)\n" % (name, args))
+	out.close()
+
+
+if __name__ == '__main__':
+	sl4aRpc()